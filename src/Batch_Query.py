@@ -0,0 +1,126 @@
+# Batch_Query.py
+"""批量路径查询
+
+同一张地图上的大量 (起点, 终点) 查询：地图只解析一次，各查询共用同一个网格及其缓冲区池；
+相同的查询只计算一次；同一终点的查询足够多时改为从终点算一次距离场（Distance_Field），
+每个起点直接查表取路径；其余查询分块交给共享内存进程池并行搜索。结果按输入顺序返回。
+
+用法示例：
+    python Batch_Query.py maze.bmap queries.json --algorithm "A* Search" --workers 8
+其中 queries.json 为 [[[起点行, 起点列], [终点行, 终点列]], ...]。
+"""
+
+import argparse
+from functools import partial
+import json
+import sys
+
+from Components import COMPONENTS
+from Distance_Field import DistanceField
+from Map_File import load_map
+from Portfolio import pool_size, shared_pool, worker_grid
+from Search import ALGORITHMS
+
+# 得到最短路径的算法；只有这些算法的查询可以用距离场代替（代价相同，路径可能是另一条等长路径）。
+# IDA*、SMA* 只在节点预算足够时才得到最短路径，不在其中
+OPTIMAL_ALGORITHMS = ("BFS", "Uniform Cost Search", "A* Search", "A* (ALT)", "Jump Point Search",
+                      "Bidirectional BFS", "Bidirectional A*", "ARA*")
+# 同一终点的查询数不少于该值时使用距离场
+FIELD_THRESHOLD = 4
+
+
+def plan_tasks(queries, algorithm, workers, field_threshold=FIELD_THRESHOLD):
+    """把去重后的查询分成任务：同一终点的查询足够多时共用一个距离场，其余查询分块逐个搜索"""
+    by_goal = {}
+    for start, goal in queries:
+        by_goal.setdefault(goal, []).append(start)
+    tasks = []
+    singles = []
+    for goal, starts in by_goal.items():
+        if algorithm in OPTIMAL_ALGORITHMS and len(starts) >= field_threshold:
+            tasks.append(("field", goal, starts))
+        else:
+            singles.extend((start, goal) for start in starts)
+    chunk = max(1, -(-len(singles) // (workers * 4)))
+    for k in range(0, len(singles), chunk):
+        tasks.append(("search", singles[k:k + chunk]))
+    return tasks
+
+
+def answer(grid, task, algorithm):
+    """在网格上完成一个任务，返回 [((起点, 终点), (路径, 代价)), ...]，不可达时路径为空、代价为 -1；
+    搜索中止（如内存受限搜索的节点预算不足）的查询同样记为路径为空、代价为 -1，不影响其他查询
+
+    与终点不连通的起点由连通分量索引直接判定，不搜索也不为其计算距离场。
+    """
+    components = COMPONENTS.get(grid)
+    results = []
+    if task[0] == "field":
+        _, goal, starts = task
+        reachable = {start for start in starts if components.connected(start, goal)}
+        field = DistanceField(grid, goal) if reachable else None
+        for start in starts:
+            path = field.path(start) if start in reachable else []
+            results.append(((start, goal), (path, len(path) - 1 if path else -1)))
+        return results
+    algorithm_class = ALGORITHMS[algorithm]
+    for start, goal in task[1]:
+        path = []
+        if components.connected(start, goal):
+            try:
+                path = algorithm_class(grid, start, goal).search()
+            except ValueError:
+                path = []
+        results.append(((start, goal), (path, len(path) - 1 if path else -1)))
+    return results
+
+
+def _answer_in_worker(task, algorithm):
+    return answer(worker_grid(), task, algorithm)
+
+
+def batch_query(grid, queries, algorithm="A* Search", workers=None, field_threshold=FIELD_THRESHOLD):
+    """批量查询，按输入顺序返回 [(路径, 代价), ...]；重复的查询共享同一个结果对象
+
+    workers 为 1 或只有一个任务时在当前进程中计算。
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"未知的搜索算法：{algorithm}")
+    keys = [(tuple(start), tuple(goal)) for start, goal in queries]
+    unique = list(dict.fromkeys(keys))
+    processes = pool_size(unique, workers) if unique else 1
+    tasks = plan_tasks(unique, algorithm, processes, field_threshold)
+    if processes == 1 or len(tasks) <= 1:
+        batches = [answer(grid, task, algorithm) for task in tasks]
+    else:
+        with shared_pool(grid, min(processes, len(tasks))) as pool:
+            batches = pool.map(partial(_answer_in_worker, algorithm=algorithm), tasks)
+    answers = dict(pair for batch in batches for pair in batch)
+    return [answers[key] for key in keys]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="同一张地图上的批量路径查询")
+    parser.add_argument("map", help=".map 或 .bmap 地图文件")
+    parser.add_argument("queries", help="JSON 查询文件：[[[起点行, 起点列], [终点行, 终点列]], ...]")
+    parser.add_argument("--algorithm", choices=list(ALGORITHMS), default="A* Search", help="搜索算法")
+    parser.add_argument("--workers", type=int, help="并行进程数，默认为 CPU 核数")
+    parser.add_argument("--output", help="保存 JSON 结果的路径，默认输出到标准输出")
+    args = parser.parse_args(argv)
+
+    grid, _, _ = load_map(args.map)
+    with open(args.queries, encoding="utf-8") as f:
+        queries = json.load(f)
+    results = batch_query(grid, queries, args.algorithm, args.workers)
+    report = [{"cost": cost, "path": [list(position) for position in path]} for path, cost in results]
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
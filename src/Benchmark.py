@@ -0,0 +1,212 @@
+# Benchmark.py
+"""无界面的搜索算法基准测试
+
+在不同尺寸、墙密度的随机地图（固定种子）上运行各搜索算法的完整搜索，
+记录耗时、扩展节点数、开放列表峰值、路径代价和内存峰值，输出 JSON 报告，
+并可与保存的基线报告比较以发现性能回退。
+
+用法示例：
+    python Benchmark.py --sizes 50 256 1024 --output report.json
+    python Benchmark.py --baseline report.json --tolerance 0.2
+    python Benchmark.py --check-frontiers 1001
+"""
+
+import argparse
+import json
+from functools import partial
+import platform
+import sys
+import time
+import tracemalloc
+
+from Grid import Grid
+from Maze_Generator import generate_maze
+from Search import ALGORITHMS, DEFAULT_ALGORITHMS, AStarSearch, SearchStats
+
+DEFAULT_SIZES = (50, 256, 1024, 4096)
+DEFAULT_DENSITIES = (0.2, 0.35)
+# 桶队列的耗时和内存峰值允许超出二叉堆的比例
+FRONTIER_TOLERANCE = 1.0
+
+
+def fresh_grid(grid):
+    """复制一份网格，使每次测量都从没有缓冲区复用的状态开始"""
+    return Grid(grid.width, grid.height, bytearray(grid.passable))
+
+
+def run_algorithm(algorithm_class, grid, start, goal, measure_memory=True, repeat=1):
+    """运行完整搜索并返回测量结果，耗时取 repeat 次中的最小值"""
+    elapsed = None
+    for _ in range(repeat):
+        expansions = 0
+        path = []
+        algorithm = algorithm_class(fresh_grid(grid), start, goal)
+        begin = time.perf_counter()
+        for result in algorithm.step_search_cells():
+            if isinstance(result, list):
+                path = result
+            else:
+                expansions += 1
+        duration = time.perf_counter() - begin
+        elapsed = duration if elapsed is None else min(elapsed, duration)
+
+    # 统计与内存单独再跑一次，避免统计和 tracemalloc 的开销计入耗时
+    stats = SearchStats()
+    copy = fresh_grid(grid)
+    peak_memory = None
+    if measure_memory:
+        tracemalloc.start()
+    try:
+        algorithm_class(copy, start, goal, stats=stats).search()
+        if measure_memory:
+            peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        if measure_memory:
+            tracemalloc.stop()
+
+    return {
+        "time_s": round(elapsed, 6),
+        "expansions": expansions,
+        "max_frontier": stats.max_frontier,
+        "pushes": stats.pushes,
+        "stale_pops": stats.stale_pops,
+        "path_cost": len(path) - 1 if path else -1,
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, densities=DEFAULT_DENSITIES, algorithms=None,
+                   generator="random", seed=0, measure_memory=True, repeat=1, log=None):
+    """在所有地图与算法的组合上运行基准测试，返回报告字典"""
+    algorithms = algorithms or DEFAULT_ALGORITHMS
+    results = []
+    for size in sizes:
+        for density in densities:
+            options = {"density": density} if generator == "random" else {}
+            grid, start, goal = generate_maze(generator, size, size, seed=seed, **options)
+            for name in algorithms:
+                record = {
+                    "algorithm": name,
+                    "size": size,
+                    "density": density if generator == "random" else None,
+                    "generator": generator,
+                    "seed": seed,
+                }
+                try:
+                    record.update(run_algorithm(ALGORITHMS[name], grid, start, goal, measure_memory, repeat))
+                except ValueError as error:
+                    record["error"] = str(error)  # 如内存受限搜索的节点预算不足，只记录该项，不中断整个测试
+                results.append(record)
+                if log:
+                    log(format_record(record))
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def record_key(record):
+    return (record["algorithm"], record["size"], record["density"], record["generator"], record["seed"])
+
+
+def format_record(record):
+    if "error" in record:
+        return f"{record['algorithm']:<22} {record['size']:>5} {str(record['density']):>5} 失败：{record['error']}"
+    memory = record["peak_memory_bytes"]
+    memory = "-" if memory is None else f"{memory / 1024:.0f}KiB"
+    return (f"{record['algorithm']:<22} {record['size']:>5} {str(record['density']):>5} "
+            f"{record['time_s']:>10.4f}s {record['expansions']:>10} {record['pushes']:>10} {record['max_frontier']:>9} "
+            f"{record['path_cost']:>8} {memory:>10}")
+
+
+def compare(report, baseline, tolerance=0.2):
+    """与基线报告比较，返回问题列表：耗时超出容差为回退，扩展数或路径代价变化为结果不一致"""
+    baseline_records = {record_key(record): record for record in baseline["results"]}
+    problems = []
+    for record in report["results"]:
+        old = baseline_records.get(record_key(record))
+        if old is None:
+            continue
+        name = f"{record['algorithm']} size={record['size']} density={record['density']}"
+        if "error" in record or "error" in old:
+            if "error" in record and "error" not in old:
+                problems.append(f"{name}: 运行失败：{record['error']}")
+            continue
+        if record["path_cost"] != old["path_cost"]:
+            problems.append(f"{name}: 路径代价 {old['path_cost']} -> {record['path_cost']}")
+        if record["expansions"] > old["expansions"]:
+            problems.append(f"{name}: 扩展节点数 {old['expansions']} -> {record['expansions']}")
+        if old["time_s"] > 0 and record["time_s"] > old["time_s"] * (1 + tolerance):
+            problems.append(f"{name}: 耗时 {old['time_s']:.4f}s -> {record['time_s']:.4f}s")
+        old_memory, memory = old.get("peak_memory_bytes"), record.get("peak_memory_bytes")
+        if old_memory and memory and memory > old_memory * (1 + tolerance):
+            problems.append(f"{name}: 内存峰值 {old_memory} -> {memory}")
+    return problems
+
+
+def check_frontiers(size=1001, seed=0, tolerance=FRONTIER_TOLERANCE, log=None):
+    """在完美迷宫（回溯法）上比较 A* 的二叉堆与桶队列（默认参数），返回问题列表：
+    桶队列的耗时或内存峰值超出二叉堆的 (1 + tolerance) 倍，或路径代价不同"""
+    grid, start, goal = generate_maze("backtracker", size, size, seed=seed)
+    records = {}
+    for frontier in ("heap", "bucket"):
+        record = run_algorithm(partial(AStarSearch, frontier=frontier), grid, start, goal)
+        records[frontier] = record
+        if log:
+            log(f"A* {frontier:<6} {size:>5} {record['time_s']:>10.4f}s {record['expansions']:>10} "
+                f"{record['path_cost']:>8} {record['peak_memory_bytes'] / 1024:>9.0f}KiB")
+    heap, bucket = records["heap"], records["bucket"]
+    problems = []
+    if bucket["path_cost"] != heap["path_cost"]:
+        problems.append(f"桶队列路径代价 {bucket['path_cost']} 与二叉堆 {heap['path_cost']} 不同")
+    for key, name in (("time_s", "耗时"), ("peak_memory_bytes", "内存峰值")):
+        if bucket[key] > heap[key] * (1 + tolerance):
+            problems.append(f"桶队列{name} {bucket[key]} 超出二叉堆 {heap[key]} 的 {1 + tolerance:g} 倍")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="搜索算法基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="地图边长")
+    parser.add_argument("--densities", type=float, nargs="+", default=list(DEFAULT_DENSITIES), help="墙的比例")
+    parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS), help="参与测试的算法，默认为除 IDA*、SMA* 外的全部算法")
+    parser.add_argument("--generator", default="random", help="地图生成器名称")
+    parser.add_argument("--seed", type=int, default=0, help="地图随机种子")
+    parser.add_argument("--repeat", type=int, default=1, help="每项重复次数，耗时取最小值")
+    parser.add_argument("--no-memory", action="store_true", help="不测量内存峰值")
+    parser.add_argument("--output", help="保存 JSON 报告的路径")
+    parser.add_argument("--baseline", help="用于比较的基线 JSON 报告")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的耗时/内存增长比例")
+    parser.add_argument("--check-frontiers", type=int, metavar="SIZE",
+                        help="只在该边长的完美迷宫上比较 A* 的二叉堆与桶队列，桶队列明显更慢或更占内存时返回 1")
+    args = parser.parse_args(argv)
+
+    if args.check_frontiers:
+        problems = check_frontiers(args.check_frontiers, args.seed, log=print)
+        for problem in problems:
+            print("回退:", problem)
+        return 1 if problems else 0
+
+    print(f"{'algorithm':<22} {'size':>5} {'dens':>5} {'time':>11} {'expanded':>10} {'pushes':>10} {'frontier':>9} "
+          f"{'cost':>8} {'memory':>10}")
+    report = run_benchmarks(args.sizes, args.densities, args.algorithms, args.generator, args.seed,
+                            measure_memory=not args.no_memory, repeat=args.repeat, log=print)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        problems = compare(report, baseline, args.tolerance)
+        for problem in problems:
+            print("回退:", problem)
+        if problems:
+            return 1
+        print("与基线相比没有发现回退")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
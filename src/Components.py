@@ -0,0 +1,196 @@
+# Components.py
+
+import numpy as np
+
+
+def label_components(grid, mask=None):
+    """给可通行格子标记连通分量，返回 (按格子编号索引的 int32 标签数组, 分量数)，墙为 0、分量从 1 开始编号
+
+    mask 为布尔数组时只标记其中为 True 的可通行格子。
+    先把每行切成水平连续段，再对上下相邻的段做向量化的并查集（挂到较小的根上并压缩路径，直到没有可合并的边），
+    全程不为格子创建 Python 对象。
+    """
+    passable = np.frombuffer(grid.passable, dtype=np.uint8) != 0
+    if mask is not None:
+        passable &= mask
+    stride = grid.stride
+    # 水平连续段：左右补边都是墙，段不会跨行
+    starts = passable.copy()
+    starts[1:] &= ~passable[:-1]
+    run = np.cumsum(starts, dtype=np.int32)
+    count = int(run[-1]) if run.size else 0
+    # 上下相邻的两段之间连一条边，同一对段的重复边只保留一条
+    cells = np.flatnonzero(passable[:-stride] & passable[stride:])
+    a, b = run[cells], run[cells + stride]
+    if a.size:
+        keep = np.ones(a.size, dtype=bool)
+        keep[1:] = (a[1:] != a[:-1]) | (b[1:] != b[:-1])
+        a, b = a[keep], b[keep]
+    parent = np.arange(count + 1, dtype=np.int32)
+    while a.size:
+        ra, rb = parent[a], parent[b]
+        different = ra != rb
+        if not different.any():
+            break
+        a, b, ra, rb = a[different], b[different], ra[different], rb[different]
+        np.minimum.at(parent, np.maximum(ra, rb), np.minimum(ra, rb))
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+    # 根重新编号为 1..分量数（段 0 不存在，其根 0 仍为 0）
+    roots, component = np.unique(parent, return_inverse=True)
+    labels = np.where(passable, component.astype(np.int32)[run], 0).astype(np.int32)
+    return labels, len(roots) - 1
+
+
+class ComponentIndex:
+    """连通分量索引：O(1) 判断两个格子是否连通
+
+    打通墙壁时把相邻分量的标签合并（标签上的小并查集）；砌墙时先看周围 8 个格子，
+    局部仍然连通就不可能断开，否则把该分量标记为待定，等到查询涉及它时再只对它重新标记。
+    索引只用于在搜索前判定不连通的查询；搜索本身不按分量限制，从起点出发的搜索本来就只会访问起点所在的分量。
+    """
+    def __init__(self, grid):
+        self.grid = grid
+        stride = grid.stride
+        # 周围 8 个格子按顺时针排列：上、右上、右、右下、下、左下、左、左上（偶数位置为四连通邻居）
+        self.ring = (-stride, -stride + 1, 1, stride + 1, stride, stride - 1, -1, -stride - 1)
+        self.labels, count = label_components(grid)
+        self.alias = list(range(count + 1))  # 标签 -> 合并后的代表标签
+        self.dirty = set()  # 可能已被砌墙分割、尚未重新标记的分量
+        self.version = grid.version
+
+    def find(self, label):
+        """标签所在分量的代表标签"""
+        alias = self.alias
+        while alias[label] != label:
+            alias[label] = alias[alias[label]]
+            label = alias[label]
+        return label
+
+    def label_of(self, position):
+        """格子所在分量的标签，墙或地图外为 0"""
+        if not self.grid.is_passable(position):
+            return 0
+        label = self.find(int(self.labels[self.grid.to_id(position)]))
+        if label in self.dirty:
+            self.relabel(label)
+            label = self.find(int(self.labels[self.grid.to_id(position)]))
+        return label
+
+    def connected(self, start, goal):
+        """两个格子是否可通行且连通"""
+        a = self.label_of(start)
+        return a != 0 and a == self.label_of(goal)
+
+    def relabel(self, label):
+        """只对一个待定分量重新标记，分出的各部分使用新标签"""
+        roots = np.array(self.alias, dtype=np.int32)
+        while True:
+            jumped = roots[roots]
+            if np.array_equal(jumped, roots):
+                break
+            roots = jumped
+        self.alias = roots.tolist()
+        self.labels = roots[self.labels]
+        mask = self.labels == label
+        parts, count = label_components(self.grid, mask)
+        first = len(self.alias)
+        self.labels[mask] = parts[mask] + (first - 1)
+        self.alias.extend(range(first, first + count))
+        self.dirty.discard(label)
+
+    def may_split(self, cell):
+        """cell 砌墙后其分量是否可能断开：周围 8 个格子中的四连通邻居不全在同一段连续的可通行格子上"""
+        passable = self.grid.passable
+        around = [passable[cell + offset] for offset in self.ring]
+        if all(around):
+            return False
+        # 从一个墙格之后开始顺时针扫描，统计含有四连通邻居的连续段数
+        begin = around.index(0) + 1
+        groups = 0
+        touching = False
+        for k in range(begin, begin + 8):
+            if around[k % 8]:
+                touching = touching or k % 2 == 0
+            else:
+                groups += touching
+                touching = False
+        groups += touching
+        return groups > 1
+
+    def cells_changed(self, positions):
+        """格子的可通行状态被修改后更新索引
+
+        positions 中的格子都已修改完毕；一次修改多个格子时，周围 8 个格子的状态不再是砌墙那一刻的状态，
+        局部判断不可靠，砌墙的分量一律标记为待定。
+        """
+        grid = self.grid
+        passable = grid.passable
+        labels = self.labels
+        positions = list(positions)
+        local = len(positions) == 1
+        for position in positions:
+            cell = grid.to_id(position)
+            if passable[cell] and not labels[cell]:
+                # 打通：与相邻的分量合并
+                merged = {self.find(int(labels[cell + offset])) for offset in grid.offsets
+                          if passable[cell + offset] and labels[cell + offset]}
+                if merged:
+                    label = min(merged)
+                    for other in merged:
+                        self.alias[other] = label
+                    if not self.dirty.isdisjoint(merged):
+                        self.dirty -= merged
+                        self.dirty.add(label)
+                else:
+                    label = len(self.alias)
+                    self.alias.append(label)
+                labels[cell] = label
+            elif not passable[cell] and labels[cell]:
+                # 砌墙：分量可能被分割
+                label = self.find(int(labels[cell]))
+                labels[cell] = 0
+                if not local or self.may_split(cell):
+                    self.dirty.add(label)
+        self.version = grid.version
+
+
+class ComponentCache:
+    """连通分量索引缓存，以网格对象为键
+
+    原地用 set_passable 修改网格后应调用 cells_changed 增量更新；
+    取用时发现网格的修改次数与索引不一致（有未通知的修改）则重新标记。
+    """
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self.indexes = {}
+
+    def get(self, grid):
+        index = self.indexes.pop(id(grid), None)
+        if index is None or index.grid is not grid or index.version != grid.version:
+            index = ComponentIndex(grid)
+            if len(self.indexes) >= self.max_entries:
+                # 淘汰最久未使用的条目
+                del self.indexes[next(iter(self.indexes))]
+        self.indexes[id(grid)] = index
+        return index
+
+    def cells_changed(self, grid, positions):
+        """通知网格上的格子已被修改"""
+        index = self.indexes.get(id(grid))
+        if index is not None and index.grid is grid:
+            index.cells_changed(positions)
+
+    def invalidate(self, grid=None):
+        """丢弃指定网格（默认全部）的索引"""
+        if grid is None:
+            self.indexes.clear()
+        else:
+            self.indexes.pop(id(grid), None)
+
+
+# 进程内共用的缓存
+COMPONENTS = ComponentCache()
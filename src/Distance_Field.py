@@ -0,0 +1,107 @@
+# Distance_Field.py
+
+import numpy as np
+
+# 波前格子数不少于该值时用 NumPy 整层推进，否则逐格推进（窄走廊迷宫的层数多而每层很窄，逐层调用 NumPy 的开销反而更大）
+VECTOR_FRONTIER = 256
+
+
+class DistanceField:
+    """以终点为源的距离场
+
+    从终点做一次反向 BFS（波前宽时按层用 NumPy 向量化推进，窄时逐格推进），
+    之后任意起点的路径代价是 O(1) 查表，路径本身沿距离递减的方向走，代价为 O(路径长度)。
+    """
+    def __init__(self, grid, goal):
+        self.grid = grid
+        self.goal = goal
+        self.goal_id = grid.to_id(goal)
+        self.distance = self.compute(grid, self.goal_id)
+
+    @staticmethod
+    def compute(grid, goal_id):
+        """计算每个格子到终点的步数，不可达为 -1"""
+        passable = np.frombuffer(grid.passable, dtype=np.uint8)
+        distance = np.full(grid.size, -1, dtype=np.int32)
+        distance[goal_id] = 0
+        offsets = np.array(grid.offsets, dtype=np.int64)
+        # 逐格推进时直接在原缓冲区上按下标读写，取得的是 Python 整数
+        cells, steps = grid.passable, distance.data
+        frontier = [goal_id]
+        depth = 0
+        while len(frontier):
+            depth += 1
+            if len(frontier) >= VECTOR_FRONTIER:
+                frontier = np.asarray(frontier, dtype=np.int64)
+                candidates = (frontier[:, None] + offsets).ravel()
+                candidates = candidates[(passable[candidates] == 1) & (distance[candidates] < 0)]
+                frontier = np.unique(candidates)
+                distance[frontier] = depth
+                if len(frontier) < VECTOR_FRONTIER:
+                    frontier = frontier.tolist()
+            else:
+                layer = []
+                for cell in frontier:
+                    for offset in grid.offsets:
+                        neighbor = cell + offset
+                        if cells[neighbor] and steps[neighbor] < 0:
+                            steps[neighbor] = depth
+                            layer.append(neighbor)
+                frontier = layer
+        return distance
+
+    def cost(self, start):
+        """起点到终点的最短路径代价，不可达时返回 -1"""
+        if not self.grid.in_bounds(start):
+            return -1
+        return int(self.distance[self.grid.to_id(start)])
+
+    def path(self, start):
+        """起点到终点的最短路径，不可达时返回空列表"""
+        if self.cost(start) < 0:
+            return []
+        grid = self.grid
+        distance = self.distance
+        current = grid.to_id(start)
+        path = [start]
+        remaining = int(distance[current])
+        while remaining > 0:
+            remaining -= 1
+            for offset in grid.offsets:
+                if distance[current + offset] == remaining:
+                    current += offset
+                    break
+            path.append(grid.to_pos(current))
+        return path
+
+
+class DistanceFieldCache:
+    """距离场缓存，以 (地图内容哈希, 终点) 为键"""
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self.fields = {}
+
+    def get(self, grid, goal):
+        """取得（必要时计算）指定地图与终点的距离场"""
+        key = (grid.content_hash(), goal)
+        field = self.fields.pop(key, None)
+        if field is None:
+            field = DistanceField(grid, goal)
+            if len(self.fields) >= self.max_entries:
+                # 淘汰最久未使用的条目
+                del self.fields[next(iter(self.fields))]
+        self.fields[key] = field
+        return field
+
+    def query(self, grid, start, goal):
+        """返回 (路径, 代价)，不可达时为 ([], -1)"""
+        field = self.get(grid, goal)
+        return field.path(start), field.cost(start)
+
+    def invalidate(self, grid=None):
+        """丢弃指定地图（默认全部）的距离场"""
+        if grid is None:
+            self.fields.clear()
+            return
+        for key in [key for key, field in self.fields.items() if field.grid is grid]:
+            del self.fields[key]
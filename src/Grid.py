@@ -0,0 +1,136 @@
+# Grid.py
+
+from array import array
+from contextlib import contextmanager
+import hashlib
+
+# 定义地图符号
+WALL = '1'
+ROAD = '0'
+START = '@'
+GOAL = '$'
+
+
+class Grid:
+    """紧凑的栅格地图模型
+
+    地图四周补一圈墙后按行展开成一维 bytearray，每个格子只占 1 字节（1 表示可通行）。
+    格子用线性编号 cell = (i + 1) * stride + (j + 1) 表示，四个邻居就是 cell 加上固定偏移量，
+    由于补了边，扩展邻居时不需要再做越界判断。
+    """
+    def __init__(self, width, height, passable=None):
+        self.width = width
+        self.height = height
+        self.stride = width + 2
+        self.size = (height + 2) * self.stride
+        self.passable = passable if passable is not None else bytearray(self.size)
+        # 邻居偏移表：上下左右，与原 get_neighbors 的方向顺序一致
+        self.offsets = (-self.stride, self.stride, -1, 1)
+        # 空闲的搜索缓冲区，供后续查询复用
+        self._free_states = []
+        # 地图内容哈希的缓存，修改格子时失效
+        self._content_hash = None
+        # 经 set_passable 修改的次数，增量维护的索引用它判断是否漏掉了修改，不必重新计算哈希
+        self.version = 0
+
+    @classmethod
+    def from_map_data(cls, map_data):
+        """由二维符号列表构建网格，墙以外的格子都视为可通行"""
+        height = len(map_data)
+        width = len(map_data[0]) if height > 0 else 0
+        grid = cls(width, height)
+        stride = grid.stride
+        for i, row in enumerate(map_data):
+            base = (i + 1) * stride + 1
+            grid.passable[base:base + width] = bytes(cell != WALL for cell in row)
+        return grid
+
+    def to_map_data(self, start=None, goal=None):
+        """转换回二维符号列表（供界面渲染使用），可选地标出起点和终点"""
+        table = bytes.maketrans(b"\x00\x01", (WALL + ROAD).encode())
+        stride = self.stride
+        map_data = []
+        for i in range(self.height):
+            base = (i + 1) * stride + 1
+            map_data.append(list(self.passable[base:base + self.width].translate(table).decode()))
+        if start is not None:
+            map_data[start[0]][start[1]] = START
+        if goal is not None:
+            map_data[goal[0]][goal[1]] = GOAL
+        return map_data
+
+    def to_id(self, position):
+        """(i, j) 坐标转换为格子编号"""
+        return (position[0] + 1) * self.stride + position[1] + 1
+
+    def to_pos(self, cell):
+        """格子编号转换为 (i, j) 坐标"""
+        i, j = divmod(cell, self.stride)
+        return (i - 1, j - 1)
+
+    def in_bounds(self, position):
+        """判断坐标是否在地图范围内"""
+        return 0 <= position[0] < self.height and 0 <= position[1] < self.width
+
+    def is_passable(self, position):
+        """判断坐标处是否可通行（地图外视为不可通行）"""
+        return self.in_bounds(position) and self.passable[self.to_id(position)] == 1
+
+    def set_passable(self, position, passable):
+        """修改单个格子的可通行状态"""
+        self.passable[self.to_id(position)] = 1 if passable else 0
+        self._content_hash = None
+        self.version += 1
+
+    def neighbors(self, cell):
+        """获取格子的可通行邻居编号"""
+        passable = self.passable
+        return [cell + offset for offset in self.offsets if passable[cell + offset]]
+
+    def manhattan(self, a, b):
+        """两个格子之间的曼哈顿距离"""
+        ai, aj = divmod(a, self.stride)
+        bi, bj = divmod(b, self.stride)
+        return abs(ai - bi) + abs(aj - bj)
+
+    def content_hash(self):
+        """地图内容的哈希值，用作预计算结果的缓存键（直接改写 passable 后需调用 set_passable 或自行清除缓存）"""
+        if self._content_hash is None:
+            digest = hashlib.blake2b(self.passable, digest_size=16)
+            digest.update(b"%d,%d" % (self.width, self.height))
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+
+    @contextmanager
+    def search_state(self):
+        """借出一份搜索缓冲区，用完自动归还，同一网格上的后续查询不会重新分配内存"""
+        state = self._free_states.pop() if self._free_states else SearchState(self.size)
+        state.reset()
+        try:
+            yield state
+        finally:
+            self._free_states.append(state)
+
+
+class SearchState:
+    """按格子编号索引的搜索簿记缓冲区
+
+    parent 和 cost 是预分配的 int32 数组，代替 parent / cost_so_far 字典；
+    mark 用轮次标记代替 visited 集合：mark[c] >= seen 表示本轮已发现，
+    mark[c] == closed 表示本轮已扩展。每轮搜索只需推进轮次，不必清空缓冲区。
+    """
+    def __init__(self, size):
+        self.parent = array('i', [-1]) * size
+        self.cost = array('i', [0]) * size
+        self.mark = array('I', [0]) * size
+        self.seen = 0
+        self.closed = 1
+
+    def reset(self):
+        """开始新一轮搜索"""
+        if self.closed + 2 > 0xFFFFFFFF:
+            # 轮次计数即将溢出时才真正清空一次
+            self.mark = array('I', [0]) * len(self.mark)
+            self.closed = 1
+        self.seen = self.closed + 1
+        self.closed = self.seen + 1
@@ -0,0 +1,123 @@
+# Headless.py
+"""无界面的搜索入口
+
+读取 .map 文本地图或 .bmap 二进制地图，用 ALGORITHMS 中的算法搜索起点到终点的路径，以 JSON 输出结果；
+参数为目录时搜索其中所有地图文件，并用进程池并行处理，适合跑整套回归地图。
+
+用法示例：
+    python Headless.py maze.map --algorithms "A* Search" BFS
+    python Headless.py maps/ --workers 8 --output results.json
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import json
+import os
+import sys
+import time
+
+from Components import COMPONENTS
+from Map_File import load_map
+from Search import ALGORITHMS, DEFAULT_ALGORITHMS, SearchStats
+
+
+def solve(grid, start, goal, algorithm_name, include_path=False):
+    """用指定算法搜索一次，返回结果字典；搜索中止（如内存受限搜索的节点预算不足）时带 error 字段
+
+    起点和终点不连通时由连通分量索引直接判定无路径，不运行搜索（扩展节点数为 0）。
+    """
+    stats = SearchStats()
+    begin = time.perf_counter()
+    error = None
+    if not COMPONENTS.get(grid).connected(start, goal):
+        path = []
+    else:
+        try:
+            path = ALGORITHMS[algorithm_name](grid, start, goal, stats=stats).search()
+        except ValueError as exception:
+            path, error = [], str(exception)
+    elapsed = time.perf_counter() - begin
+    record = {
+        "algorithm": algorithm_name,
+        "found": bool(path),
+        "cost": len(path) - 1 if path else -1,
+        "expansions": stats.expansions,
+        "max_frontier": stats.max_frontier,
+        "time_s": round(elapsed, 6),
+    }
+    if error is not None:
+        record["error"] = error
+    if include_path:
+        record["path"] = [list(position) for position in path]
+    return record
+
+
+def run_map_file(filename, algorithms, include_path=False):
+    """读取一个地图文件并依次运行各算法；出错时返回带 error 字段的结果，不中断整批任务"""
+    try:
+        grid, start, goal = load_map(filename)
+        if start is None or goal is None:
+            raise ValueError("地图中缺少起点或终点")
+    except (OSError, ValueError) as error:
+        return [{"map": filename, "error": str(error)}]
+    records = []
+    for name in algorithms:
+        record = {"map": filename, "width": grid.width, "height": grid.height}
+        record.update(solve(grid, start, goal, name, include_path))
+        records.append(record)
+    return records
+
+
+def collect_map_files(paths):
+    """展开参数中的目录（递归查找 .map 和 .bmap 文件），保持参数顺序，目录内按文件名排序"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            found = []
+            for directory, _, names in os.walk(path):
+                found.extend(os.path.join(directory, name) for name in names if name.endswith((".map", ".bmap")))
+            files.extend(sorted(found))
+        else:
+            files.append(path)
+    return files
+
+
+def run_batch(files, algorithms=None, workers=None, include_path=False):
+    """批量处理地图文件，结果按输入顺序排列；workers 为 1 或只有一个文件时在当前进程中运行"""
+    algorithms = algorithms or DEFAULT_ALGORITHMS
+    task = partial(run_map_file, algorithms=algorithms, include_path=include_path)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(files) <= 1:
+        batches = map(task, files)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(files))) as executor:
+            batches = list(executor.map(task, files))
+    return [record for records in batches for record in records]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="无界面的迷宫搜索")
+    parser.add_argument("paths", nargs="+", help="地图文件或包含地图文件的目录")
+    parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS), help="运行的算法，默认为除 IDA*、SMA* 外的全部算法")
+    parser.add_argument("--workers", type=int, help="并行进程数，默认为 CPU 核数")
+    parser.add_argument("--path", action="store_true", help="在结果中包含完整路径")
+    parser.add_argument("--output", help="保存 JSON 结果的路径，默认输出到标准输出")
+    args = parser.parse_args(argv)
+
+    files = collect_map_files(args.paths)
+    if not files:
+        parser.error("没有找到地图文件")
+    results = run_batch(files, args.algorithms, args.workers, args.path)
+    report = {"python": sys.version.split()[0], "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    return 1 if any("error" in record for record in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
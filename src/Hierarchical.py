@@ -0,0 +1,346 @@
+# Hierarchical.py
+
+import heapq
+import re
+
+# 默认的簇边长（格子数）
+DEFAULT_CLUSTER_SIZE = 16
+# 边界上连续可通行段的长度不小于该值时在两端各放一个入口，否则只在中点放一个
+LONG_ENTRANCE = 6
+
+_RUN = re.compile(b"\x01+")
+
+
+class HierarchicalPlanner:
+    """HPA* 分层路径规划器
+
+    把网格划分为 cluster_size × cluster_size 的簇，在相邻簇的公共边界上找出连续可通行段并放置入口，
+    每个入口是边界两侧一对相邻的格子（抽象节点），二者之间是代价为 1 的簇间边；
+    同一簇内抽象节点之间的簇内距离在第一次用到该簇时用限制在簇内的 BFS 计算并缓存。
+    查询时把起点和终点接入抽象图，在抽象图上做 A*，再把抽象路径逐段细化为格子路径。
+    得到的路径接近最短但不保证最短；修改格子后只需重建受影响的簇。
+    """
+    def __init__(self, grid, cluster_size=DEFAULT_CLUSTER_SIZE):
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.cluster_rows = -(-grid.height // cluster_size)
+        self.cluster_cols = -(-grid.width // cluster_size)
+        self.transitions = {}  # 边界 (簇, 相邻簇) -> [(本侧格子, 对侧格子), ...]
+        self.partners = {}  # 抽象节点 -> 簇间边另一端的格子列表
+        self.intra = {}  # 簇 -> {抽象节点: [(相邻节点, 距离), ...]}，按需计算
+        self.adjacency = {}  # 抽象节点 -> [(相邻节点, 距离), ...]，已算出的各簇 intra 的并集
+        self.build()
+        self.version = grid.version  # 网格修改次数，用于发现未通知的修改
+
+    # ---- 抽象图的构建 ----
+
+    def build(self):
+        """找出所有边界上的入口"""
+        for ci in range(self.cluster_rows):
+            for cj in range(self.cluster_cols):
+                for border in self.cluster_borders((ci, cj), forward_only=True):
+                    self.set_transitions(border, self.find_transitions(*border))
+
+    def cluster_of(self, cell):
+        """格子编号所在的簇"""
+        i, j = divmod(cell, self.grid.stride)
+        return ((i - 1) // self.cluster_size, (j - 1) // self.cluster_size)
+
+    def cluster_bounds(self, cluster):
+        """簇覆盖的行、列范围 [r0, r1) × [c0, c1)"""
+        size = self.cluster_size
+        r0, c0 = cluster[0] * size, cluster[1] * size
+        return r0, min(r0 + size, self.grid.height), c0, min(c0 + size, self.grid.width)
+
+    def cluster_borders(self, cluster, forward_only=False):
+        """簇的边界：右侧和下方（forward_only 为 False 时还包括左侧和上方），每个边界为 (簇, 相邻簇)"""
+        ci, cj = cluster
+        borders = []
+        if cj + 1 < self.cluster_cols:
+            borders.append((cluster, (ci, cj + 1)))
+        if ci + 1 < self.cluster_rows:
+            borders.append((cluster, (ci + 1, cj)))
+        if not forward_only:
+            if cj > 0:
+                borders.append(((ci, cj - 1), cluster))
+            if ci > 0:
+                borders.append(((ci - 1, cj), cluster))
+        return borders
+
+    def find_transitions(self, cluster, other):
+        """在 cluster 与其右侧或下方的相邻簇 other 之间的边界上放置入口"""
+        grid = self.grid
+        stride = grid.stride
+        passable = grid.passable
+        r0, r1, c0, c1 = self.cluster_bounds(cluster)
+        if other[1] > cluster[1]:
+            # 竖直边界：本簇最右一列与相邻簇最左一列
+            first = (r0 + 1) * stride + c1  # 第 r0 行、第 c1 - 1 列的格子
+            step, step_across, count = stride, 1, r1 - r0
+        else:
+            # 水平边界：本簇最下一行与相邻簇最上一行
+            first = r1 * stride + c0 + 1  # 第 r1 - 1 行、第 c0 列的格子
+            step, step_across, count = 1, stride, c1 - c0
+        end = first + step * count
+        near = passable[first:end:step]
+        far = passable[first + step_across:end + step_across:step]
+        both = bytes(map(int.__and__, near, far))
+        transitions = []
+        for run in _RUN.finditer(both):
+            s, e = run.start(), run.end()
+            positions = (s + (e - s) // 2,) if e - s < LONG_ENTRANCE else (s, e - 1)
+            for k in positions:
+                cell = first + k * step
+                transitions.append((cell, cell + step_across))
+        return transitions
+
+    def set_transitions(self, border, transitions):
+        """替换一条边界上的入口，同时维护簇间边"""
+        partners = self.partners
+        for a, b in self.transitions.get(border, ()):
+            for x, y in ((a, b), (b, a)):
+                partners[x].remove(y)
+                if not partners[x]:
+                    del partners[x]
+        for a, b in transitions:
+            partners.setdefault(a, []).append(b)
+            partners.setdefault(b, []).append(a)
+        self.transitions[border] = transitions
+
+    def cluster_nodes(self, cluster):
+        """簇内的抽象节点"""
+        nodes = []
+        for border in self.cluster_borders(cluster):
+            own = 0 if border[0] == cluster else 1
+            for pair in self.transitions.get(border, ()):
+                if pair[own] not in nodes:
+                    nodes.append(pair[own])
+        return nodes
+
+    def local_bfs(self, source, cluster, targets):
+        """限制在簇内的 BFS，找到全部 targets 即停止，返回 ({可达目标: 距离}, 父节点查询函数)
+
+        搜索在簇的局部副本（四周补一圈墙）上进行，邻居不需要做越界判断。
+        """
+        grid = self.grid
+        stride = grid.stride
+        r0, r1, c0, c1 = self.cluster_bounds(cluster)
+        local_stride = c1 - c0 + 2
+        local = bytearray(local_stride)
+        for row in range(r0 + 1, r1 + 1):
+            local += b"\x00"
+            local += grid.passable[row * stride + c0 + 1:row * stride + c1 + 1]
+            local += b"\x00"
+        local += bytes(local_stride)
+
+        # 全局编号 (i + 1) * stride + j + 1 与局部编号 (i - r0 + 1) * local_stride + j - c0 + 1 互相转换
+        def to_local(cell):
+            i, j = divmod(cell, stride)
+            return (i - r0) * local_stride + j - c0
+
+        def to_global(cell):
+            i, j = divmod(cell, local_stride)
+            return (i + r0) * stride + j + c0
+
+        wanted = {to_local(target): target for target in targets}
+        start = to_local(source)
+        distance = [-1] * len(local)
+        parent = [-1] * len(local)
+        distance[start] = 0
+        found = {}
+        if start in wanted:
+            found[wanted[start]] = 0
+        offsets = (-local_stride, local_stride, -1, 1)
+        queue = [start]
+        for current in queue:
+            if len(found) == len(wanted):
+                break
+            step = distance[current] + 1
+            for offset in offsets:
+                neighbor = current + offset
+                if local[neighbor] and distance[neighbor] < 0:
+                    distance[neighbor] = step
+                    parent[neighbor] = current
+                    queue.append(neighbor)
+                    if neighbor in wanted:
+                        found[wanted[neighbor]] = step
+
+        def parent_of(cell):
+            previous = parent[to_local(cell)]
+            return to_global(previous) if previous >= 0 else -1
+        return found, parent_of
+
+    def cluster_edges(self, cluster):
+        """簇内各抽象节点的出边：到同簇节点的簇内距离以及代价为 1 的簇间边（第一次用到时计算并缓存）"""
+        edges = self.intra.get(cluster)
+        if edges is None:
+            nodes = self.cluster_nodes(cluster)
+            edges = {}
+            for node in nodes:
+                distance, _ = self.local_bfs(node, cluster, nodes)
+                edges[node] = [(other, step) for other, step in distance.items() if other != node]
+                edges[node].extend((partner, 1) for partner in self.partners.get(node, ()))
+            self.intra[cluster] = edges
+            self.adjacency.update(edges)
+        return edges
+
+    def drop_cluster(self, cluster):
+        """丢弃簇的出边缓存"""
+        for node in self.intra.pop(cluster, ()):
+            del self.adjacency[node]
+
+    def precompute(self):
+        """一次性算出所有簇的簇内距离，之后的查询不再做任何预处理"""
+        for ci in range(self.cluster_rows):
+            for cj in range(self.cluster_cols):
+                self.cluster_edges((ci, cj))
+
+    def cells_changed(self, positions):
+        """格子被修改后只重建受影响的簇：重新放置这些簇四周边界上的入口，并丢弃相关簇的簇内距离"""
+        grid = self.grid
+        clusters = {self.cluster_of(grid.to_id(position)) for position in positions}
+        borders = {border for cluster in clusters for border in self.cluster_borders(cluster)}
+        for border in borders:
+            self.set_transitions(border, self.find_transitions(*border))
+            # 边界上的入口变化会改变两侧簇的节点集合
+            clusters.update(border)
+        for cluster in clusters:
+            self.drop_cluster(cluster)
+        self.version = grid.version
+
+    # ---- 查询 ----
+
+    def abstract_steps(self, start_id, goal_id, stats=None):
+        """在抽象图上逐步搜索：依次产出扩展的抽象节点，最后产出抽象路径（首尾为起点和终点，找不到时为空列表）"""
+        if start_id == goal_id:
+            yield [start_id]
+            return
+        grid = self.grid
+        start_cluster = self.cluster_of(start_id)
+        goal_cluster = self.cluster_of(goal_id)
+        # 起点、终点接入抽象图：各做一次簇内 BFS
+        targets = self.cluster_nodes(start_cluster)
+        if goal_cluster == start_cluster:
+            targets.append(goal_id)
+        start_edges = list(self.local_bfs(start_id, start_cluster, targets)[0].items())
+        to_goal, _ = self.local_bfs(goal_id, goal_cluster, self.cluster_nodes(goal_cluster))
+
+        # 起点本身也可能是入口
+        start_edges.extend((partner, 1) for partner in self.partners.get(start_id, ()))
+
+        stride = grid.stride
+        gi, gj = divmod(goal_id, stride)
+        adjacency = self.adjacency
+        cost = {start_id: 0}
+        parent = {start_id: -1}
+        closed = set()
+        heap = [(grid.manhattan(start_id, goal_id), 0, start_id)]
+        while heap:
+            _, current_cost, current = heapq.heappop(heap)
+            if stats:
+                stats.popped(len(heap) + 1, current in closed)
+            if current in closed:
+                continue
+            yield current
+            if current == goal_id:
+                path = []
+                while current != -1:
+                    path.append(current)
+                    current = parent[current]
+                path.reverse()
+                yield path
+                return
+            closed.add(current)
+            if current == start_id:
+                edges = start_edges
+            else:
+                edges = adjacency.get(current)
+                if edges is None:
+                    edges = self.cluster_edges(self.cluster_of(current))[current]
+                if current in to_goal:
+                    edges = edges + [(goal_id, to_goal[current])]
+            for neighbor, step in edges:
+                new_cost = current_cost + step
+                if new_cost < cost.get(neighbor, new_cost + 1):
+                    cost[neighbor] = new_cost
+                    parent[neighbor] = current
+                    i, j = divmod(neighbor, stride)
+                    heapq.heappush(heap, (new_cost + abs(i - gi) + abs(j - gj), new_cost, neighbor))
+        yield []
+
+    def abstract_search(self, start_id, goal_id):
+        """抽象路径（格子编号列表），找不到时返回空列表"""
+        result = []
+        for result in self.abstract_steps(start_id, goal_id):
+            pass
+        return result
+
+    def refine_segments(self, abstract_path):
+        """把抽象路径逐段细化为格子路径，依次产出每段的格子编号列表（不含该段起点）
+
+        按需细化：只需要路径前几步（例如让智能体先出发）的调用者可以提前停止。
+        """
+        partners = self.partners
+        for a, b in zip(abstract_path, abstract_path[1:]):
+            if b in partners.get(a, ()):
+                yield [b]
+                continue
+            _, parent_of = self.local_bfs(a, self.cluster_of(a), (b,))
+            segment = []
+            current = b
+            while current != a:
+                segment.append(current)
+                current = parent_of(current)
+            segment.reverse()
+            yield segment
+
+    def find_path(self, start, goal):
+        """起点到终点的路径（(i, j) 列表），不可达时返回空列表"""
+        grid = self.grid
+        abstract = self.abstract_search(grid.to_id(start), grid.to_id(goal))
+        if not abstract:
+            return []
+        cells = [abstract[0]]
+        for segment in self.refine_segments(abstract):
+            cells.extend(segment)
+        return [grid.to_pos(cell) for cell in cells]
+
+
+class HierarchyCache:
+    """分层规划器缓存，以网格对象为键
+
+    原地用 set_passable 修改网格后应调用 cells_changed 做局部重建；
+    取用时发现网格的修改次数与规划器不一致（有未通知的修改）则整体重建，不必每次重新计算整张地图的哈希。
+    """
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self.planners = {}
+
+    def get(self, grid, cluster_size=DEFAULT_CLUSTER_SIZE):
+        key = (id(grid), cluster_size)
+        planner = self.planners.pop(key, None)
+        if planner is None or planner.grid is not grid or planner.version != grid.version:
+            planner = HierarchicalPlanner(grid, cluster_size)
+            if len(self.planners) >= self.max_entries:
+                # 淘汰最久未使用的条目
+                del self.planners[next(iter(self.planners))]
+        self.planners[key] = planner
+        return planner
+
+    def cells_changed(self, grid, positions):
+        """通知网格上的格子已被修改，对应的规划器只重建受影响的簇"""
+        for planner in self.planners.values():
+            if planner.grid is grid:
+                planner.cells_changed(positions)
+
+    def invalidate(self, grid=None):
+        """丢弃指定网格（默认全部）的规划器"""
+        if grid is None:
+            self.planners.clear()
+            return
+        for key in [key for key, planner in self.planners.items() if planner.grid is grid]:
+            del self.planners[key]
+
+
+# 进程内共用的缓存
+HIERARCHIES = HierarchyCache()
@@ -0,0 +1,162 @@
+# Landmarks.py
+
+import os
+
+import numpy as np
+
+from Distance_Field import DistanceField
+
+# 默认的地标数量
+DEFAULT_LANDMARKS = 8
+# 地标距离表的磁盘缓存目录
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "IntroToAI_exp", "landmarks")
+# 磁盘缓存的总大小上限（字节），超出时删除最久未使用的文件
+DEFAULT_DISK_LIMIT = 512 * 1024 * 1024
+
+
+class LandmarkTable:
+    """ALT（A*、地标、三角不等式）启发式所需的地标距离表
+
+    在一个连通区域内选出至多 count 个地标（最远点选取：每次选离已选地标最远的格子），
+    用距离场算出每个地标到所有格子的精确步数。
+    由三角不等式，|d(L, goal) - d(L, n)| 不超过 n 到终点的真实距离，取所有地标中的最大值（再与曼哈顿距离取大）
+    即为可采纳且一致的启发式，在绕路多的迷宫上远比曼哈顿距离准确。
+    """
+    def __init__(self, grid, landmarks, distances):
+        self.grid = grid
+        self.landmarks = landmarks  # 地标的格子编号
+        self.distances = distances  # (地标数, grid.size) 的 int32 数组，不可达为 -1
+        self.rows = [memoryview(row) for row in distances]  # 逐格查表用，按下标取值直接得到 Python 整数
+
+    @classmethod
+    def build(cls, grid, count=DEFAULT_LANDMARKS):
+        """用最远点选取法选出地标并计算距离表"""
+        passable = np.flatnonzero(np.frombuffer(grid.passable, dtype=np.uint8))
+        if passable.size < 2:
+            return cls(grid, [], np.zeros((0, grid.size), dtype=np.int32))
+        # 从靠近地图中心的格子出发（通常位于最大的连通区域内），第一个地标取离它最远的格子
+        center = (grid.height // 2 + 1) * grid.stride + grid.width // 2 + 1
+        seed = int(passable[np.argmin(np.abs(passable - center))])
+        nearest = DistanceField.compute(grid, seed)  # 到已选地标的最近距离，不可达为 -1
+        landmarks = []
+        distances = []
+        for _ in range(count):
+            landmark = int(np.argmax(nearest))
+            if nearest[landmark] <= 0:
+                break  # 连通区域内的格子都已是地标
+            distance = DistanceField.compute(grid, landmark)
+            landmarks.append(landmark)
+            distances.append(distance)
+            nearest = distance if len(landmarks) == 1 else np.minimum(nearest, distance)
+        return cls(grid, landmarks, np.array(distances, dtype=np.int32).reshape(len(landmarks), grid.size))
+
+    def heuristic(self, goal_id):
+        """到指定终点的启发式函数：只取出终点所在的一列，每个格子的值在搜索用到时才计算，单次查询不必遍历整张地图"""
+        stride = self.grid.stride
+        gi, gj = divmod(goal_id, stride)
+        # 与终点不连通的地标不提供信息
+        columns = [(row, row[goal_id]) for row in self.rows if row[goal_id] >= 0]
+
+        def bound(cell):
+            i, j = divmod(cell, stride)
+            h = abs(i - gi) + abs(j - gj)
+            for row, goal_distance in columns:
+                distance = row[cell]
+                if distance >= 0:
+                    estimate = distance - goal_distance if distance > goal_distance else goal_distance - distance
+                    if estimate > h:
+                        h = estimate
+            return h
+        return bound
+
+
+class LandmarkCache:
+    """地标距离表缓存：内存中以 (地图内容哈希, 地标数) 为键，并以同样的键保存到磁盘
+
+    磁盘缓存目录不可用时只使用内存缓存。每次编辑地图后的查询都会得到新的哈希，
+    因此磁盘上的文件按最近使用时间淘汰，总大小不超过 max_disk_bytes。
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_entries=4, max_disk_bytes=DEFAULT_DISK_LIMIT):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.tables = {}
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, "%s-%d.npz" % key)
+
+    def get(self, grid, count=DEFAULT_LANDMARKS):
+        """取得（必要时读取或计算）指定地图的地标距离表"""
+        key = (grid.content_hash(), count)
+        table = self.tables.pop(key, None)
+        if table is None:
+            table = self.load(grid, key)
+        if table is None:
+            table = LandmarkTable.build(grid, count)
+            self.save(key, table)
+        elif table.grid is not grid:
+            table = LandmarkTable(grid, table.landmarks, table.distances)
+        if len(self.tables) >= self.max_entries:
+            # 淘汰最久未使用的条目
+            del self.tables[next(iter(self.tables))]
+        self.tables[key] = table
+        return table
+
+    def load(self, grid, key):
+        if self.cache_dir is None:
+            return None
+        path = self.path_for(key)
+        try:
+            with np.load(path) as data:
+                landmarks, distances = data["landmarks"].tolist(), data["distances"]
+            os.utime(path)  # 记为最近使用
+        except (OSError, KeyError, ValueError):
+            return None
+        if distances.shape[1:] != (grid.size,):
+            return None
+        return LandmarkTable(grid, landmarks, distances)
+
+    def save(self, key, table):
+        if self.cache_dir is None:
+            return
+        path = self.path_for(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # 先写临时文件再改名，避免并行进程读到写了一半的文件
+            temporary = "%s.%d.tmp" % (path, os.getpid())
+            with open(temporary, "wb") as f:
+                np.savez(f, landmarks=np.array(table.landmarks, dtype=np.int64), distances=table.distances)
+            os.replace(temporary, path)
+        except OSError:
+            return
+        self.prune(keep=path)
+
+    def prune(self, keep=None):
+        """从最久未使用的文件开始删除磁盘缓存，直到总大小不超过 max_disk_bytes（keep 指定的文件不删除）"""
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                files = [(entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                         for entry in entries if entry.name.endswith(".npz")]
+        except OSError:
+            return
+        files.sort(reverse=True)
+        total = 0
+        for _, size, path in files:
+            total += size
+            if total > self.max_disk_bytes and path != keep:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # 可能已被其他进程删除
+
+    def invalidate(self, grid=None):
+        """丢弃指定地图（默认全部）在内存中的距离表"""
+        if grid is None:
+            self.tables.clear()
+            return
+        for key in [key for key, table in self.tables.items() if table.grid is grid]:
+            del self.tables[key]
+
+
+# 进程内共用的缓存
+LANDMARKS = LandmarkCache()
@@ -0,0 +1,122 @@
+# Map_File.py
+"""地图文件的读写
+
+文本格式 .map：每行是一行地图，格子之间用逗号分隔（与 README 中的示例一致，行首尾的引号和行末的逗号可有可无）：
+    "1,@,1,1",
+    "1,0,0,1",
+其中 1 为墙壁，0 为通路，@ 为起点，$ 为终点。
+
+二进制格式 .bmap：头部（魔数、版本、宽、高、起点、终点）之后是按位打包的可通行标记，每个格子 1 位。
+打包的是 Grid.passable 的补边布局，解包结果就是搜索算法使用的缓冲区，不需要再逐行重排。
+文件通过内存映射读取，整个过程不会为格子创建 Python 对象。
+"""
+
+import mmap
+import struct
+
+import numpy as np
+
+from Grid import Grid, WALL, ROAD, START, GOAL
+
+# 读取时删除的字符：分隔符、引号和空白
+_SEPARATORS = b'," \t\r\n'
+# 墙 -> 0，其余符号 -> 1
+_PASSABLE_TABLE = bytes(0 if byte == ord(WALL) else 1 for byte in range(256))
+
+BINARY_MAGIC = b"BMAP"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<4sIIIiiii")
+
+
+def read_map(filename):
+    """流式读取 .map 文件，返回 (网格, 起点, 终点)
+
+    逐行以字节处理：删除分隔符后每个字节就是一个格子，再查表转换为可通行标记追加到网格缓冲区，
+    不会为每个格子创建字符串。
+    """
+    start = goal = None
+    width = None
+    height = 0
+    passable = None
+    with open(filename, "rb") as f:
+        for line in f:
+            row = line.translate(None, _SEPARATORS)
+            if not row:
+                continue
+            if width is None:
+                width = len(row)
+                passable = bytearray(width + 2)  # 上方补边
+            elif len(row) != width:
+                raise ValueError(f"地图第 {height + 1} 行的宽度 {len(row)} 与第一行的宽度 {width} 不一致")
+            j = row.find(START.encode())
+            if j >= 0:
+                start = (height, j)
+            j = row.find(GOAL.encode())
+            if j >= 0:
+                goal = (height, j)
+            passable += b"\x00"
+            passable += row.translate(_PASSABLE_TABLE)
+            passable += b"\x00"
+            height += 1
+    if width is None:
+        raise ValueError("地图为空")
+    passable += bytes(width + 2)  # 下方补边
+    return Grid(width, height, passable), start, goal
+
+
+def write_map(filename, grid, start=None, goal=None):
+    """把网格写成 .map 文本文件（每行形如 "1,0,0,1",），整张地图用 NumPy 一次拼好再写出"""
+    width, height = grid.width, grid.height
+    cells = np.frombuffer(grid.passable, dtype=np.uint8).reshape(height + 2, width + 2)[1:-1, 1:-1]
+    text = np.empty((height, 2 * width + 3), dtype=np.uint8)
+    text[:, 0] = ord('"')
+    text[:, 1:2 * width:2] = np.where(cells == 1, ord(ROAD), ord(WALL))
+    text[:, 2:2 * width - 1:2] = ord(",")
+    text[:, 2 * width] = ord('"')
+    text[:, 2 * width + 1] = ord(",")
+    text[:, 2 * width + 2] = ord("\n")
+    if start is not None:
+        text[start[0], 1 + 2 * start[1]] = ord(START)
+    if goal is not None:
+        text[goal[0], 1 + 2 * goal[1]] = ord(GOAL)
+    with open(filename, "wb") as f:
+        f.write(text.tobytes())
+
+
+def write_binary_map(filename, grid, start=None, goal=None):
+    """把网格写成按位打包的二进制地图"""
+    start = start if start is not None else (-1, -1)
+    goal = goal if goal is not None else (-1, -1)
+    bits = np.packbits(np.frombuffer(grid.passable, dtype=np.uint8))
+    with open(filename, "wb") as f:
+        f.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, grid.width, grid.height, *start, *goal))
+        f.write(bits.tobytes())
+
+
+def read_binary_map(filename):
+    """内存映射读取二进制地图，返回 (网格, 起点, 终点)"""
+    with open(filename, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if len(mapped) < BINARY_HEADER.size:
+                raise ValueError("二进制地图文件不完整")
+            magic, version, width, height, si, sj, gi, gj = BINARY_HEADER.unpack_from(mapped)
+            if magic != BINARY_MAGIC or version != BINARY_VERSION:
+                raise ValueError("不是可识别的二进制地图文件")
+            size = (height + 2) * (width + 2)
+            if len(mapped) - BINARY_HEADER.size < (size + 7) // 8:
+                raise ValueError("二进制地图文件不完整")
+            bits = np.frombuffer(mapped, dtype=np.uint8, offset=BINARY_HEADER.size)
+            passable = bytearray(np.unpackbits(bits, count=size))
+            del bits  # 释放对映射的引用后才能关闭
+    start = (si, sj) if si >= 0 else None
+    goal = (gi, gj) if gi >= 0 else None
+    return Grid(width, height, passable), start, goal
+
+
+def load_map(filename):
+    """按文件内容自动识别文本或二进制格式并读取，返回 (网格, 起点, 终点)"""
+    with open(filename, "rb") as f:
+        magic = f.read(len(BINARY_MAGIC))
+    if magic == BINARY_MAGIC:
+        return read_binary_map(filename)
+    return read_map(filename)
@@ -0,0 +1,218 @@
+# Maze_Generator.py
+
+from array import array
+import random
+
+import numpy as np
+
+from Grid import Grid
+
+
+class MazeGenerator:
+    """迷宫生成器基类
+
+    生成结果直接写入紧凑网格 Grid（不经过 Tk，也不创建逐格字符串），
+    相同的 seed 总是得到相同的地图，并且保证起点与终点连通，生成过程不会失败。
+    """
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.random = random.Random(seed)
+
+    def generate(self, width, height, start=None, goal=None):
+        """生成地图，返回 (grid, start, goal)；默认起点 (1, 1)，终点 (height - 2, width - 2)"""
+        if width < 1 or height < 1:
+            raise ValueError("地图尺寸必须为正数")
+        start = start if start is not None else (min(1, height - 1), min(1, width - 1))
+        goal = goal if goal is not None else (max(height - 2, 0), max(width - 2, 0))
+        grid = Grid(width, height)
+        for position in (start, goal):
+            if not grid.in_bounds(position):
+                raise ValueError(f"位置 {position} 超出地图范围")
+        self.carve(grid, start, goal)
+        grid.set_passable(start, True)
+        grid.set_passable(goal, True)
+        return grid, start, goal
+
+    def carve(self, grid, start, goal):
+        """在全墙的网格上开辟通路，需在子类中实现"""
+        raise NotImplementedError("必须在子类中实现此方法")
+
+    @staticmethod
+    def carve_line(grid, a, b):
+        """开辟一条从 a 到 b 的 L 形通路（先纵向再横向）"""
+        (i1, j1), (i2, j2) = a, b
+        stride = grid.stride
+        low, high = sorted((i1, i2))
+        for i in range(low, high + 1):
+            grid.passable[(i + 1) * stride + j1 + 1] = 1
+        low, high = sorted((j1, j2))
+        base = (i2 + 1) * stride + 1
+        grid.passable[base + low:base + high + 1] = b"\x01" * (high - low + 1)
+
+
+class PerfectMazeGenerator(MazeGenerator):
+    """完美迷宫（任意两点间恰有一条路径）生成器的基类
+
+    迷宫单元位于行列下标均为奇数的格子上，相邻单元之间隔一堵墙，
+    子类决定打通哪些墙；起点、终点不在单元上时，用短直线连到最近的单元。
+    """
+    def carve(self, grid, start, goal):
+        rows = range(1, grid.height - 1, 2)
+        cols = range(1, grid.width - 1, 2)
+        if not rows or not cols:
+            # 地图太小，放不下迷宫单元
+            self.carve_line(grid, start, goal)
+            return
+        stride = grid.stride
+        # 标记迷宫单元所在的格子编号
+        cells = bytearray(grid.size)
+        for i in rows:
+            base = (i + 1) * stride
+            cells[base + 2:base + cols[-1] + 2:2] = b"\x01" * len(cols)
+        self.carve_cells(grid, cells, rows, cols)
+        for position in (start, goal):
+            self.carve_line(grid, position, self.nearest_cell(position, rows, cols))
+
+    @staticmethod
+    def nearest_cell(position, rows, cols):
+        """离给定位置最近的迷宫单元"""
+        i, j = position
+        i = min(max(i if i % 2 else i - 1, rows[0]), rows[-1])
+        j = min(max(j if j % 2 else j - 1, cols[0]), cols[-1])
+        return (i, j)
+
+    def carve_cells(self, grid, cells, rows, cols):
+        """打通迷宫单元之间的墙，需在子类中实现"""
+        raise NotImplementedError("必须在子类中实现此方法")
+
+
+class RecursiveBacktracker(PerfectMazeGenerator):
+    """递归回溯迷宫（用显式栈实现，不受递归深度限制），走廊长而曲折"""
+    def carve_cells(self, grid, cells, rows, cols):
+        passable = grid.passable
+        steps = (-2 * grid.stride, 2 * grid.stride, -2, 2)
+        choice = self.random.choice
+        first = grid.to_id((self.random.choice(rows), self.random.choice(cols)))
+        passable[first] = 1
+        stack = [first]
+        while stack:
+            current = stack[-1]
+            options = [step for step in steps
+                       if cells[current + step] and not passable[current + step]]
+            if not options:
+                stack.pop()
+                continue
+            step = choice(options)
+            passable[current + step // 2] = 1
+            passable[current + step] = 1
+            stack.append(current + step)
+
+
+class KruskalGenerator(PerfectMazeGenerator):
+    """随机化 Kruskal 迷宫：随机顺序遍历单元间的墙，用并查集避免成环，分支短而多"""
+    def carve_cells(self, grid, cells, rows, cols):
+        passable = grid.passable
+        stride = grid.stride
+        cell_ids = np.flatnonzero(np.frombuffer(cells, dtype=np.uint8))
+        passable_view = np.frombuffer(passable, dtype=np.uint8)
+        passable_view[cell_ids] = 1
+        # 候选墙：每个单元与其右侧、下方单元之间的墙，编码为 (单元, 步长)
+        right = cell_ids[np.frombuffer(cells, dtype=np.uint8)[cell_ids + 2] == 1]
+        down = cell_ids[np.frombuffer(cells, dtype=np.uint8)[cell_ids + 2 * stride] == 1]
+        walls = np.concatenate((right * 2, down * 2 + 1))
+        rng = np.random.default_rng(self.seed)
+        walls = rng.permutation(walls).tolist()
+
+        parent = array('i', range(grid.size))
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]  # 路径减半
+                cell = parent[cell]
+            return cell
+
+        for wall in walls:
+            cell, vertical = wall >> 1, wall & 1
+            step = 2 * stride if vertical else 2
+            a, b = find(cell), find(cell + step)
+            if a != b:
+                parent[a] = b
+                passable[cell + step // 2] = 1
+
+
+class WilsonGenerator(PerfectMazeGenerator):
+    """Wilson 迷宫：用擦除环的随机游走生成均匀随机生成树，没有方向偏好"""
+    def carve_cells(self, grid, cells, rows, cols):
+        passable = grid.passable
+        steps = (-2 * grid.stride, 2 * grid.stride, -2, 2)
+        rng = np.random.default_rng(self.seed)
+        order = rng.permutation(np.flatnonzero(np.frombuffer(cells, dtype=np.uint8))).tolist()
+        getrandbits = self.random.getrandbits
+        in_tree = passable  # 已加入生成树的单元都已被打通
+        direction = {}
+
+        in_tree[order[0]] = 1
+        for cell in order[1:]:
+            if in_tree[cell]:
+                continue
+            # 随机游走直到碰到生成树，只记录每个单元最后一次离开的方向（等价于擦除环）
+            current = cell
+            while not in_tree[current]:
+                step = steps[getrandbits(2)]
+                if cells[current + step]:  # 走出迷宫范围的方向直接重抽
+                    direction[current] = step
+                    current += step
+            # 沿记录的方向把路径加入生成树
+            current = cell
+            while not in_tree[current]:
+                step = direction.pop(current)
+                in_tree[current] = 1
+                passable[current + step // 2] = 1
+                current += step
+            direction.clear()
+
+
+class RandomFillGenerator(MazeGenerator):
+    """随机填充地图：先开辟一条起点到终点的随机单调通路，再按 density（墙的比例）向量化地随机填充其余格子"""
+    CHUNK_ROWS = 1024
+
+    def __init__(self, seed=None, density=0.5):
+        super().__init__(seed)
+        if not 0 <= density <= 1:
+            raise ValueError("墙的比例必须在 0 到 1 之间")
+        self.density = density
+
+    def carve(self, grid, start, goal):
+        rng = np.random.default_rng(self.seed)
+        padded = np.frombuffer(grid.passable, dtype=np.uint8).reshape(grid.height + 2, grid.stride)
+        interior = padded[1:-1, 1:-1]
+        # 分块生成，避免一次性分配整张浮点随机数矩阵
+        for top in range(0, grid.height, self.CHUNK_ROWS):
+            block = interior[top:top + self.CHUNK_ROWS]
+            block[...] = rng.random(block.shape, dtype=np.float32) >= self.density
+
+        # 随机打乱纵向与横向的步子，得到一条必然到达终点的单调路径
+        (si, sj), (gi, gj) = start, goal
+        moves = np.concatenate((
+            np.full(abs(gi - si), np.sign(gi - si) * grid.stride, dtype=np.int64),
+            np.full(abs(gj - sj), np.sign(gj - sj), dtype=np.int64),
+        ))
+        path = grid.to_id(start) + np.concatenate(([0], np.cumsum(rng.permutation(moves))))
+        padded.reshape(-1)[path] = 1
+
+
+# 可用的地图生成器
+GENERATORS = {
+    "random": RandomFillGenerator,
+    "backtracker": RecursiveBacktracker,
+    "kruskal": KruskalGenerator,
+    "wilson": WilsonGenerator,
+}
+
+
+def generate_maze(kind, width, height, start=None, goal=None, seed=None, **options):
+    """按名称选择生成器生成地图，返回 (grid, start, goal)"""
+    generator_class = GENERATORS.get(kind)
+    if generator_class is None:
+        raise ValueError(f"未知的地图生成器：{kind}")
+    return generator_class(seed=seed, **options).generate(width, height, start, goal)
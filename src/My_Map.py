@@ -1,9 +1,17 @@
 import tkinter as tk
 from tkinter import Canvas, messagebox
 from PIL import Image, ImageTk  # 导入Pillow库
-import random
 import time
-from Search import DFS, BFS, UniformCostSearch, GreedySearch, AStarSearch
+from Search import ALGORITHMS, LPAStarSearch, SearchStats
+from Grid import Grid
+from Distance_Field import DistanceFieldCache
+from Components import COMPONENTS
+from Hierarchical import HIERARCHIES
+from Maze_Generator import generate_maze
+from Map_File import load_map, write_map, write_binary_map
+from Renderer import RENDERERS, ViewportRenderer
+from Trace import SearchTrace
+import Portfolio
 
 # 定义地图符号
 WALL = '1'
@@ -30,27 +38,74 @@ path_bg = rgb_to_hex(path_rgb)
 final_path_rgb = (50, 205, 50)  # 绿色用于最终路径
 final_path_bg = rgb_to_hex(final_path_rgb)
 
+start_goal_rgb = (255, 0, 0)  # 红色用于起点和终点（没有图片时）
+start_goal_fill = rgb_to_hex(start_goal_rgb)
+
+agent_rgb = (0, 255, 0)  # 绿色用于 AGENT（没有图片时）
+agent_fill = rgb_to_hex(agent_rgb)
+
+# "auto" 播放方式下每帧用于推进搜索的时间预算（秒）和帧间隔（毫秒）
+FRAME_BUDGET = 0.012
+FRAME_DELAY_AUTO = 16
+
+# 回放时 "auto" / "skip" 播放方式下每帧推进的步数
+REPLAY_STEPS_AUTO = 200
+
+# 格子数超过该值时默认使用位图渲染后端
+RASTER_THRESHOLD = 40000
+
+# 画布的最大像素尺寸，地图超出时默认使用可滚动缩放的视口渲染后端
+MAX_VIEW_WIDTH = 1200
+MAX_VIEW_HEIGHT = 800
+# 界面中地图边长的上限：视口只让每帧的绘制开销取决于画布大小，地图本身仍以每格一个符号的二维列表保存，
+# 内存以及生成、载入地图后的完整绘制仍随地图大小增长
+MAX_MAP_SIZE = 2000
+# 搜索过程中画在地图上的标记：探索过的格子、AGENT 和最终路径
+MARK_SYMBOLS = (PATH, AGENT, 'F')
+
 class My_Map:
-    def __init__(self, width, height, cell_size, canvas):
-        """初始化地图的宽度、高度和每个单元格的大小"""
+    def __init__(self, width, height, cell_size, canvas, backend=None):
+        """初始化地图的宽度、高度和每个单元格的大小；backend 为渲染后端（"canvas"、"raster" 或 "viewport"），默认按地图大小选择"""
         self.width = width
         self.height = height
         self.cell_size = cell_size
         self.map_data = []  # 用于存储地图的二维列表
+        self.marked_cells = set()  # 画有 MARK_SYMBOLS 标记的格子，清除标记时只需检查这些格子
         self.canvas = canvas  # 画布引用
 
-        # 调整图片大小并加载
+        # 调整图片大小并加载（格子太小时图片至少保留 1 像素）
+        image_size = max(self.cell_size - 1, 1)
         try:
             start_goal_image = Image.open("E:\Python_Project\IntroToAI_exp\src\image\Start_Goal.png")
             agent_image = Image.open("E:\Python_Project\IntroToAI_exp\src\image\Agent.png")
         except FileNotFoundError:
             # 使用简单的颜色块代替图片
-            start_goal_image = Image.new("RGB", (self.cell_size - 1, self.cell_size - 1), (255, 0, 0))
-            agent_image = Image.new("RGB", (self.cell_size - 1, self.cell_size - 1), (0, 255, 0))
+            start_goal_image = Image.new("RGB", (image_size, image_size), start_goal_rgb)
+            agent_image = Image.new("RGB", (image_size, image_size), agent_rgb)
 
         # 调整为与单元格相匹配的大小
-        self.start_goal_bg = ImageTk.PhotoImage(start_goal_image.resize((self.cell_size-1, self.cell_size-1)))
-        self.agent_bg = ImageTk.PhotoImage(agent_image.resize((self.cell_size-1, self.cell_size-1)))
+        self.start_goal_bg = ImageTk.PhotoImage(start_goal_image.resize((image_size, image_size)))
+        self.agent_bg = ImageTk.PhotoImage(agent_image.resize((image_size, image_size)))
+
+        # 渲染器只重绘发生变化的格子，dirty_cells 记录自上次渲染以来被修改的格子
+        if backend is None:
+            if width * cell_size > MAX_VIEW_WIDTH or height * cell_size > MAX_VIEW_HEIGHT:
+                backend = "viewport"
+            elif width * height > RASTER_THRESHOLD:
+                backend = "raster"
+            else:
+                backend = "canvas"
+        # colors 中越靠后的符号在视口缩小显示时优先级越高
+        self.renderer = RENDERERS[backend](
+            self.canvas, self.cell_size,
+            colors={ROAD: road_bg, WALL: wall_bg, PATH: path_bg, 'F': final_path_bg},
+            images={START: self.start_goal_bg, GOAL: self.start_goal_bg, AGENT: self.agent_bg},
+            default_color=road_bg,
+            image_colors={START: start_goal_fill, GOAL: start_goal_fill, AGENT: agent_fill},
+        )
+        self.dirty_cells = set()
+        if isinstance(self.renderer, ViewportRenderer):
+            self.renderer.resize(min(width * cell_size, MAX_VIEW_WIDTH), min(height * cell_size, MAX_VIEW_HEIGHT))
 
         # AGENT 的初始位置
         self.agent_pos = None
@@ -64,18 +119,42 @@ class My_Map:
 
         # 动画控制
         self.is_animating = False
-
-    def generate_random_map(self, width=None, height=None, cell_size=None, start_position=None, goal_position=None):
-        """生成随机地图，确保起点和终点之间有通路，先生成路径，再随机设置其他方块"""
+        self.anytime = False  # 当前搜索是否会产出多条逐渐变好的路径
+        self.best_path = []
+
+        # 搜索动画的播放方式：每帧推进的步数，"auto" 表示在时间预算内尽量多推进，"skip" 表示直接显示结果
+        self.playback = 1
+        self.frame_delay = 100  # 两帧之间的间隔（毫秒）
+        self.skip_requested = False
+
+        # 最近一次搜索的过程记录，以及回放状态（replay_step 为已回放的步数，None 表示不在回放）
+        self.trace = None
+        self.replay_step = None
+        self.replay_paused = False
+        self.replay_job = None
+        self.replay_scale = None
+
+        # 供搜索算法使用的紧凑网格（按需构建）及终点距离场缓存，地图改变时失效
+        self.grid = None
+        self.distance_fields = DistanceFieldCache()
+
+        # 当前搜索的统计信息
+        self.search_stats = None
+
+        # 增量规划器，以及上次规划后被修改过的格子
+        self.planner = None
+        self.changed_cells = []
+
+    def generate_random_map(self, width=None, height=None, cell_size=None, start_position=None, goal_position=None,
+                            generator="random", seed=None):
+        """生成随机地图，确保起点和终点之间有通路；generator 为 Maze_Generator.GENERATORS 中的生成算法名称"""
         if width:
             self.width = width
         if height:
             self.height = height
         if cell_size:
             self.cell_size = cell_size
-
-        # 初始化空地图
-        self.map_data = [[WALL for _ in range(self.width)] for _ in range(self.height)]
+        self.invalidate_grid()
 
         # 设置起点和终点
         if start_position:
@@ -93,58 +172,18 @@ class My_Map:
         else:
             self.goal_pos = (self.height - 2, self.width - 2)
 
-        # 确保起点和终点设置正确
-        self.map_data[self.start_pos[0]][self.start_pos[1]] = START
-        self.map_data[self.goal_pos[0]][self.goal_pos[1]] = GOAL
-
-        # 随机生成一条从起点到终点的通路
-        self.create_random_path(self.start_pos, self.goal_pos)
-
-        # 随机设置剩余的格子
-        for i in range(self.height):
-            for j in range(self.width):
-                if self.map_data[i][j] == ROAD:
-                    continue  # 保留生成路径时设置的道路
-                elif self.map_data[i][j] not in [START, GOAL]:
-                    self.map_data[i][j] = random.choice([WALL, ROAD])
-
-    def create_random_path(self, start, goal):
-        """在起点和终点之间生成一条随机路径"""
-        current = start
-        path = [current]
-
-        while current != goal:
-            i, j = current
-            neighbors = self.get_neighbors_for_path(i, j, goal)
-
-            if not neighbors:
-                raise ValueError("无法生成路径，请检查地图大小或起点终点位置")
-
-            next_step = random.choice(neighbors)
-            path.append(next_step)
-            current = next_step
-
-        # 将路径上的格子设置为道路
-        for i, j in path:
-            if self.map_data[i][j] not in [START, GOAL]:
-                self.map_data[i][j] = ROAD
-
-    def get_neighbors_for_path(self, i, j, goal):
-        """获取用于生成路径的合法邻居（上下左右，并朝向终点优先）"""
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # 上下左右
-        neighbors = []
-
-        for di, dj in directions:
-            ni, nj = i + di, j + dj
-            if 0 <= ni < self.height and 0 <= nj < self.width:
-                if self.map_data[ni][nj] == WALL or (ni, nj) == goal:
-                    neighbors.append((ni, nj))
-
-        return neighbors
+        # 生成器直接产出紧凑网格，保证起点与终点连通，再转换为界面使用的符号列表
+        grid, _, _ = generate_maze(generator, self.width, self.height, self.start_pos, self.goal_pos, seed=seed)
+        self.map_data = grid.to_map_data(self.start_pos, self.goal_pos)
+        self.marked_cells = set()
+        self.grid = grid
 
     def set_map(self, map_data):
         """根据指定的字符串地图数据来设置地图"""
         self.map_data = [row.split(',') for row in map_data]
+        self.marked_cells = {(i, j) for i, row in enumerate(self.map_data)
+                             for j, cell in enumerate(row) if cell in MARK_SYMBOLS}
+        self.invalidate_grid()
 
         # 记录 START 和 GOAL 的位置
         for i, row in enumerate(self.map_data):
@@ -154,36 +193,135 @@ class My_Map:
                 elif cell == GOAL:
                     self.goal_pos = (i, j)
 
-    def render_map(self):
-        """在 Tkinter 画布中渲染地图"""
-        self.canvas.delete("all")  # 清除之前的绘制
+    def load_map_file(self, filename):
+        """读取 .map 文本地图或 .bmap 二进制地图"""
+        grid, start, goal = load_map(filename)
+        self.invalidate_grid()
+        self.width, self.height = grid.width, grid.height
+        self.start_pos, self.goal_pos = start, goal
+        self.map_data = grid.to_map_data(start, goal)
+        self.marked_cells = set()
+        self.grid = grid
+
+    def save_map_file(self, filename):
+        """保存当前地图（只保存墙、道路、起点和终点），扩展名为 .bmap 时保存为二进制格式"""
+        writer = write_binary_map if filename.endswith(".bmap") else write_map
+        writer(filename, self.get_grid(), self.start_pos, self.goal_pos)
+
+    def get_grid(self):
+        """取得当前地图的紧凑网格，地图未改变时重复使用"""
+        if self.grid is None:
+            self.grid = Grid.from_map_data(self.map_data)
+        return self.grid
+
+    def invalidate_grid(self):
+        """地图内容改变后调用，丢弃网格及其距离场缓存"""
+        if self.grid is not None:
+            self.distance_fields.invalidate(self.grid)
+            HIERARCHIES.invalidate(self.grid)
+            COMPONENTS.invalidate(self.grid)
+        self.grid = None
+        self.planner = None
+        self.changed_cells = []
+
+    def set_cell(self, position, symbol):
+        """修改单个格子（开墙或砌墙），网格在原地更新，增量规划器下次运行时只修复受影响的部分"""
+        i, j = position
+        self.paint_cell(i, j, symbol)
+        if self.grid is not None:
+            self.distance_fields.invalidate(self.grid)
+            self.grid.set_passable(position, symbol != WALL)
+            HIERARCHIES.cells_changed(self.grid, [position])
+            COMPONENTS.cells_changed(self.grid, [position])
+        self.changed_cells.append(position)
+
+    def toggle_wall(self, position):
+        """在墙与道路之间切换指定格子，起点和终点不可修改"""
+        if self.is_animating:
+            return  # 在动画过程中禁止编辑地图
+        if position in (self.start_pos, self.goal_pos):
+            return
+        i, j = position
+        if not (0 <= i < self.height and 0 <= j < self.width):
+            return
+        self.set_cell(position, ROAD if self.map_data[i][j] == WALL else WALL)
+        self.render_map()
 
-        # 根据 map_data 渲染地图
-        for i, row in enumerate(self.map_data):
-            for j, cell in enumerate(row):
-                x1 = j * self.cell_size
-                y1 = i * self.cell_size
-                x2 = x1 + self.cell_size
-                y2 = y1 + self.cell_size
-
-                if cell == WALL:
-                    color = wall_bg
-                    self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="black")
-                elif cell == ROAD:
-                    color = road_bg
-                    self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="black")
-                elif cell == PATH:
-                    color = path_bg
-                    self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="black")
-                elif cell == START or cell == GOAL:
-                    self.canvas.create_image(x1 + self.cell_size // 2, y1 + self.cell_size // 2,
-                                             image=self.start_goal_bg)
-                elif cell == AGENT:
-                    self.canvas.create_image(x1 + self.cell_size // 2, y1 + self.cell_size // 2, image=self.agent_bg)
-                elif cell == 'F':
-                    # 渲染最终路径
-                    color = final_path_bg
-                    self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="black")
+    def bind_mouse(self):
+        """绑定鼠标左键点击画布切换墙壁"""
+        def on_click(event):
+            position = self.renderer.cell_at(event.x, event.y)
+            if position is not None:
+                self.toggle_wall(position)
+        self.canvas.bind('<Button-1>', on_click)
+
+    def zoom(self, steps, x=0, y=0):
+        """以画布像素坐标 (x, y) 为中心缩放视口"""
+        if isinstance(self.renderer, ViewportRenderer):
+            self.render_map()
+            self.renderer.zoom(steps, x, y)
+            self.cell_size = self.renderer.cell_size
+
+    def scroll(self, rows, cols):
+        """视口平移若干格"""
+        if isinstance(self.renderer, ViewportRenderer):
+            self.render_map()
+            self.renderer.scroll(rows, cols)
+
+    def bind_viewport(self, root):
+        """使用视口渲染时绑定滚轮缩放、方向键滚动、右键拖动平移以及画布尺寸变化"""
+        if not isinstance(self.renderer, ViewportRenderer):
+            return
+        renderer = self.renderer
+        canvas = self.canvas
+
+        def page(fraction):
+            rows, cols = renderer.visible_cells()
+            return max(1, int(rows * fraction)), max(1, int(cols * fraction))
+
+        def on_wheel(event):
+            self.zoom(1 if event.num == 4 or getattr(event, 'delta', 0) > 0 else -1, event.x, event.y)
+
+        drag_from = [0, 0]  # 右键拖动的上一个锚点
+
+        def on_drag_start(event):
+            drag_from[:] = [event.x, event.y]
+
+        def on_drag(event):
+            x0, y0 = drag_from
+            step = renderer.cell_size
+            rows, cols = (y0 - event.y) // step, (x0 - event.x) // step
+            if rows or cols:
+                self.scroll(rows * renderer.lod, cols * renderer.lod)
+                drag_from[:] = [x0 - cols * step, y0 - rows * step]
+
+        canvas.bind('<MouseWheel>', on_wheel)  # Windows / macOS
+        canvas.bind('<Button-4>', on_wheel)  # Linux 滚轮向上
+        canvas.bind('<Button-5>', on_wheel)  # Linux 滚轮向下
+        canvas.bind('<ButtonPress-3>', on_drag_start)
+        canvas.bind('<B3-Motion>', on_drag)
+        canvas.bind('<Configure>', lambda event: renderer.resize(event.width, event.height))
+        root.bind('<Up>', lambda event: self.scroll(-page(0.25)[0], 0))
+        root.bind('<Down>', lambda event: self.scroll(page(0.25)[0], 0))
+        root.bind('<Left>', lambda event: self.scroll(0, -page(0.25)[1]))
+        root.bind('<Right>', lambda event: self.scroll(0, page(0.25)[1]))
+
+    def query_shortest_path(self, start):
+        """利用终点距离场查询任意起点到终点的最短路径，返回 (路径, 代价)"""
+        return self.distance_fields.query(self.get_grid(), start, self.goal_pos)
+
+    def paint_cell(self, i, j, symbol):
+        """修改格子的显示符号，并记为待重绘"""
+        self.map_data[i][j] = symbol
+        self.dirty_cells.add((i, j))
+        if symbol in MARK_SYMBOLS:
+            self.marked_cells.add((i, j))
+
+    def render_map(self, full=False):
+        """在 Tkinter 画布中渲染地图：地图被替换或 full 为 True 时完整绘制，否则只重绘发生变化的格子"""
+        self.renderer.cell_size = self.cell_size
+        self.renderer.render(self.map_data, None if full else self.dirty_cells)
+        self.dirty_cells = set()
 
     def find_start_position(self):
         """找到起点的位置"""
@@ -198,20 +336,20 @@ class My_Map:
             # 将之前的位置恢复为原始符号（ROAD, START, GOAL）
             prev_i, prev_j = self.agent_pos
             if (prev_i, prev_j) == self.start_pos:
-                self.map_data[prev_i][prev_j] = START
+                self.paint_cell(prev_i, prev_j, START)
             elif (prev_i, prev_j) == self.goal_pos:
-                self.map_data[prev_i][prev_j] = GOAL
+                self.paint_cell(prev_i, prev_j, GOAL)
             else:
-                self.map_data[prev_i][prev_j] = ROAD
+                self.paint_cell(prev_i, prev_j, ROAD)
 
         i, j = position
 
         # 将新的位置设置为 AGENT
         if self.map_data[i][j] == START or self.map_data[i][j] == GOAL:
             # 如果新的位置是 START 或 GOAL，依然显示 AGENT
-            self.map_data[i][j] = AGENT
+            self.paint_cell(i, j, AGENT)
         else:
-            self.map_data[i][j] = AGENT
+            self.paint_cell(i, j, AGENT)
 
         self.agent_pos = position
         self.render_map()
@@ -278,21 +416,29 @@ class My_Map:
                 i, j = pos
                 if final:
                     # 最终路径用绿色显示
-                    self.map_data[i][j] = 'F'  # 标记为最终路径
+                    self.paint_cell(i, j, 'F')  # 标记为最终路径
                 else:
                     # 探索路径用浅蓝色显示
-                    self.map_data[i][j] = PATH
+                    self.paint_cell(i, j, PATH)
         self.render_map()
 
     def create_cost_label(self, root):
         """在窗口上创建一个用于显示路径代价的Label"""
         self.cost_label = tk.Label(root, text="路径代价: 未知", font=("Helvetica", 14), fg="black")
         self.cost_label.pack(side=tk.BOTTOM)
+        # 搜索统计信息显示在路径代价旁边
+        self.stats_label = tk.Label(root, text="", font=("Helvetica", 11), fg="gray25")
+        self.stats_label.pack(side=tk.BOTTOM)
 
     def display_cost(self, cost):
         """在Label上显示路径代价"""
         self.cost_label.config(text=f"路径代价: {cost}")
 
+    def display_stats(self):
+        """在Label上显示当前搜索的统计信息"""
+        if self.search_stats is not None:
+            self.stats_label.config(text=self.search_stats.summary())
+
     def animate_agent_movement(self, path, delay=300):
         """动画展示 AGENT 沿路径移动"""
         if not path:
@@ -318,84 +464,317 @@ class My_Map:
         self.current_step += 1
 
         # 调用下一步动画
-        self.canvas.after(self.animation_delay, self.animate_step())
+        self.canvas.after(self.animation_delay, self.animate_step)
+
+    def clear_path_marks(self):
+        """清除之前的路径和代理位置，只检查画过标记的格子"""
+        marked, self.marked_cells = self.marked_cells, set()
+        for i, j in marked:
+            if self.map_data[i][j] in MARK_SYMBOLS:  # 之后可能已被改成墙
+                self.paint_cell(i, j, ROAD)
+
+        # AGENT 停在起点或终点上时，恢复起点和终点的符号
+        for position, symbol in ((self.start_pos, START), (self.goal_pos, GOAL)):
+            if position is not None and self.map_data[position[0]][position[1]] != symbol:
+                self.paint_cell(position[0], position[1], symbol)
+        self.agent_pos = None
+        self.replay_step = None
+        self.render_map()  # 重绘地图，确保之前的路径已清除
+
+    def endpoints_connected(self):
+        """用连通分量索引检查起点和终点是否连通，不连通时直接提示，不必运行搜索"""
+        if COMPONENTS.get(self.get_grid()).connected(self.start_pos, self.goal_pos):
+            return True
+        messagebox.showinfo("提示", "起点和终点不连通，没有路径。")
+        return False
 
     def run_search_and_animate(self, algorithm_class):
         """运行指定的搜索算法并动画展示路径"""
         if self.is_animating:
             return  # 防止重复点击
 
-        # 清除之前的路径和代理位置
-        for i, row in enumerate(self.map_data):
-            for j, cell in enumerate(row):
-                if cell in [PATH, AGENT, 'F']:  # 清除之前标记的路径和最终路径
-                    self.map_data[i][j] = ROAD
-                elif cell == 'F':  # 清除最终路径标记为道路
-                    self.map_data[i][j] = ROAD
-                elif cell == AGENT:  # 清除AGENT位置
-                    self.map_data[i][j] = ROAD
-
-        self.render_map()  # 重绘地图，确保之前的路径已清除
+        self.clear_path_marks()
+        if not self.endpoints_connected():
+            return
 
         # 初始化搜索算法
-        search_algo = algorithm_class(self.map_data, self.start_pos, self.goal_pos)
-        self.search_generator = search_algo.step_search()
+        self.search_stats = SearchStats()
+        search_algo = algorithm_class(self.get_grid(), self.start_pos, self.goal_pos, stats=self.search_stats)
+        self.trace = SearchTrace(self.width, self.height, algorithm_class.__name__)
+        self.search_generator = self.trace.record(search_algo.step_search())
+        self.anytime = algorithm_class.anytime
+        self.best_path = []
         self.is_animating = True
         self.animate_search_step()
 
+    def run_incremental_search(self):
+        """使用 LPA* 规划并动画展示；地图被编辑后再次运行时复用上次的搜索结果，只修复受影响的节点"""
+        if self.is_animating:
+            return  # 防止重复点击
+
+        self.clear_path_marks()
+        if not self.endpoints_connected():
+            return
+
+        if self.planner is None:
+            self.planner = LPAStarSearch(self.get_grid(), self.start_pos, self.goal_pos)
+        elif self.changed_cells:
+            self.planner.cells_changed(self.changed_cells)
+        self.changed_cells = []
+
+        self.search_stats = SearchStats()
+        self.planner.stats = self.search_stats
+        self.trace = SearchTrace(self.width, self.height, type(self.planner).__name__)
+        self.search_generator = self.trace.record(self.planner.step_search())
+        self.anytime = False
+        self.best_path = []
+        self.is_animating = True
+        self.animate_search_step()
+
+    def set_playback(self, playback):
+        """设置搜索动画的播放方式：正整数为每帧推进的步数，"auto" 为按帧时间预算推进，"skip" 为直接显示结果"""
+        if playback == "auto":
+            self.frame_delay = FRAME_DELAY_AUTO
+        elif playback == "skip":
+            self.frame_delay = 0
+        elif isinstance(playback, int) and playback > 0:
+            self.frame_delay = 100
+        else:
+            raise ValueError(f"未知的播放方式：{playback}")
+        self.playback = playback
+
+    def skip_to_result(self):
+        """正在播放的搜索动画直接运行到结果"""
+        if self.is_animating:
+            self.skip_requested = True
+
     def animate_search_step(self):
-        """逐步动画展示搜索过程"""
+        """按播放方式推进搜索动画，一帧内推进的所有步合并为一次重绘"""
+        playback = "skip" if self.skip_requested else self.playback
+        deadline = time.perf_counter() + FRAME_BUDGET
+        steps = 0
         try:
-            result = next(self.search_generator)
-            if isinstance(result, list):
-                # 搜索完成，显示最终路径
+            while True:
+                result = next(self.search_generator)
+                if isinstance(result, list):
+                    if not self.anytime:
+                        break
+                    # 随时可用的搜索：记下当前最好的路径，继续改进直到搜索结束
+                    self.best_path = result
+                    continue
+                self.mark_explored(result)
+                steps += 1
+                if playback == "skip":
+                    continue
+                if playback == "auto":
+                    if time.perf_counter() >= deadline:
+                        break
+                elif steps >= playback:
+                    break
+        except StopIteration:
+            if not self.anytime:
                 self.is_animating = False
-                if result:
-                    self.display_path(result, final=True)  # 用绿色显示最终路径
-                    self.animate_agent_movement(result)
+                self.skip_requested = False
+                self.render_map()
+                messagebox.showinfo("提示", "搜索结束，没有找到路径。")
+                return
+            result = self.best_path
+        except ValueError as error:
+            # 内存受限的搜索在节点预算不足时中止
+            self.is_animating = False
+            self.skip_requested = False
+            self.render_map()
+            messagebox.showwarning("搜索中止", str(error))
+            return
 
-                    # 计算路径代价并显示
-                    path_cost = len(result) - 1  # 路径代价为路径长度（步数），减去起点
-                    self.display_cost(path_cost)
+        self.display_stats()
+        if not isinstance(result, list):
+            # 更新地图，显示本帧探索的节点，然后继续下一帧
+            self.render_map()
+            self.canvas.after(self.frame_delay, self.animate_search_step)
+            return
 
-                else:
-                    messagebox.showinfo("提示", "没有找到从起点到终点的路径。")
+        # 搜索完成，显示最终路径
+        self.is_animating = False
+        self.skip_requested = False
+        if result:
+            self.display_path(result, final=True)  # 用绿色显示最终路径
+            self.animate_agent_movement(result)
+
+            # 计算路径代价并显示
+            path_cost = len(result) - 1  # 路径代价为路径长度（步数），减去起点
+            self.display_cost(path_cost)
+        else:
+            self.render_map()
+            messagebox.showinfo("提示", "没有找到从起点到终点的路径。")
+
+    def mark_explored(self, position):
+        """把当前探索的节点标记为 AGENT，之前的 AGENT 位置标记为 PATH 或恢复为 START/GOAL"""
+        if self.agent_pos:
+            prev_i, prev_j = self.agent_pos
+            if (prev_i, prev_j) == self.start_pos:
+                self.paint_cell(prev_i, prev_j, START)
+            elif (prev_i, prev_j) == self.goal_pos:
+                self.paint_cell(prev_i, prev_j, GOAL)
             else:
-                # 更新地图，显示当前探索的节点
-                i, j = result
-
-                # 处理之前的AGENT位置
-                if self.agent_pos:  # 将之前的AGENT位置标记为PATH或START/GOAL
-                    prev_i, prev_j = self.agent_pos
-                    if (prev_i, prev_j) == self.start_pos:
-                        self.map_data[prev_i][prev_j] = START
-                    elif (prev_i, prev_j) == self.goal_pos:
-                        self.map_data[prev_i][prev_j] = GOAL
-                    else:
-                        self.map_data[prev_i][prev_j] = PATH
-
-                # 将当前节点标记为AGENT
-                self.map_data[i][j] = AGENT
-                self.agent_pos = (i, j)  # 更新AGENT位置
-                self.render_map()
+                self.paint_cell(prev_i, prev_j, PATH)
 
-                # 设置一个延迟，然后继续下一步
-                self.canvas.after(100, self.animate_search_step)
-        except StopIteration:
+        i, j = position
+        self.paint_cell(i, j, AGENT)
+        self.agent_pos = (i, j)  # 更新AGENT位置
+
+    def save_trace(self, filename):
+        """把最近一次搜索的过程记录保存到文件"""
+        if self.trace is None:
+            raise ValueError("还没有可保存的搜索记录")
+        self.trace.save(filename)
+
+    def load_trace(self, filename):
+        """从文件载入搜索记录并从头开始回放"""
+        trace = SearchTrace.load(filename)
+        if (trace.width, trace.height) != (self.width, self.height):
+            raise ValueError("搜索记录与当前地图的尺寸不一致")
+        self.replay_trace(trace)
+
+    def create_replay_scale(self, root):
+        """在窗口上创建用于拖动回放进度的滑块"""
+        self.replay_scale = tk.Scale(root, from_=0, to=0, orient=tk.HORIZONTAL, length=400, label="回放进度",
+                                     command=lambda value: self.seek_replay(int(value)))
+        self.replay_scale.pack(side=tk.BOTTOM)
+
+    def replay_trace(self, trace=None):
+        """不重新运行搜索，按播放方式从头回放搜索记录（默认回放最近一次搜索）"""
+        if self.is_animating:
+            return
+        if trace is not None:
+            self.trace = trace
+        if self.trace is None:
+            messagebox.showwarning("警告", "还没有可回放的搜索记录。")
+            return
+        self.clear_path_marks()
+        self.replay_step = 0
+        self.replay_paused = False
+        if self.replay_scale is not None:
+            self.replay_scale.config(to=len(self.trace))
+        self.is_animating = True
+        self.animate_replay_step()
+
+    def animate_replay_step(self):
+        """回放动画的一帧，每帧推进的步数与搜索动画相同（"auto" 和 "skip" 按固定步数推进）"""
+        self.replay_job = None
+        if self.replay_step is None:
             self.is_animating = False
-            messagebox.showinfo("提示", "搜索结束，没有找到路径。")
+            return
+        steps = self.playback if isinstance(self.playback, int) else REPLAY_STEPS_AUTO
+        self.seek_replay(min(self.replay_step + steps, len(self.trace)))
+        if self.replay_step >= len(self.trace):
+            self.is_animating = False
+            return
+        self.replay_job = self.canvas.after(self.frame_delay, self.animate_replay_step)
+
+    def stop_replay_animation(self):
+        """取消尚未执行的回放帧"""
+        if self.replay_job is not None:
+            self.canvas.after_cancel(self.replay_job)
+            self.replay_job = None
+        self.is_animating = False
+
+    def pause_replay(self):
+        """暂停或继续回放"""
+        if self.replay_step is None:
+            return
+        self.replay_paused = not self.replay_paused
+        if self.replay_paused:
+            self.stop_replay_animation()
+        elif self.replay_job is None:
+            self.is_animating = True
+            self.animate_replay_step()
+
+    def step_replay(self, delta):
+        """暂停回放并前进或后退 delta 步"""
+        if self.replay_step is None:
+            return
+        self.replay_paused = True
+        self.stop_replay_animation()
+        self.seek_replay(max(0, min(self.replay_step + delta, len(self.trace))))
+
+    def replay_symbol(self, position, step):
+        """回放到第 step 步时格子应显示的符号（不含 AGENT 和最终路径）"""
+        if position == self.start_pos:
+            return START
+        if position == self.goal_pos:
+            return GOAL
+        first = self.trace.first_step_of(position)
+        return PATH if first is not None and first < step else ROAD
+
+    def seek_replay(self, step):
+        """把地图显示调整到回放第 step 步时的状态，只重绘与当前状态不同的格子"""
+        if self.replay_step is None or step == self.replay_step:
+            return
+        trace = self.trace
+        current = self.replay_step
+        done = len(trace)
+
+        # 离开结束状态时撤销最终路径
+        if current == done and trace.path:
+            for position in trace.path:
+                self.paint_cell(position[0], position[1], self.replay_symbol(position, step))
+
+        if self.agent_pos is not None:
+            self.paint_cell(self.agent_pos[0], self.agent_pos[1], self.replay_symbol(self.agent_pos, step))
+            self.agent_pos = None
+
+        if step > current:
+            for index in range(current, step):
+                position = trace.position(index)
+                if position != self.start_pos and position != self.goal_pos:
+                    self.paint_cell(position[0], position[1], PATH)
+        else:
+            # 只有在 [step, current) 中第一次被探索的格子需要恢复为道路
+            first = trace.first_steps()
+            for index in range(step, current):
+                if first[index]:
+                    position = trace.position(index)
+                    self.paint_cell(position[0], position[1], self.replay_symbol(position, step))
+
+        if step > 0:
+            i, j = trace.position(step - 1)
+            self.paint_cell(i, j, AGENT)
+            self.agent_pos = (i, j)
+        if step == done and trace.path:
+            for i, j in trace.path:
+                if (i, j) != self.start_pos and (i, j) != self.goal_pos:
+                    self.paint_cell(i, j, 'F')
+
+        self.replay_step = step
+        self.render_map()
+        if self.replay_scale is not None and self.replay_scale.get() != step:
+            self.replay_scale.set(step)
+        if hasattr(self, 'stats_label'):
+            self.stats_label.config(text=f"回放 {trace.algorithm}: {step} / {done} 步")
+
+    def run_portfolio(self, mode="compare"):
+        """在多个进程中同时运行所有搜索算法：race 显示最先找到的路径，compare 显示各算法的对比表"""
+        if self.is_animating:
+            return
+        self.clear_path_marks()
+        if not self.endpoints_connected():
+            return
+        if mode == "race":
+            record = Portfolio.race(self.get_grid(), self.start_pos, self.goal_pos, include_path=True)
+            if record is None:
+                messagebox.showinfo("提示", "没有找到从起点到终点的路径。")
+                return
+            self.display_path([tuple(position) for position in record["path"]], final=True)
+            self.display_cost(record["cost"])
+            self.stats_label.config(text=f"最先找到路径：{record['algorithm']}，扩展 {record['expansions']} 个节点")
+        else:
+            records = Portfolio.compare(self.get_grid(), self.start_pos, self.goal_pos)
+            messagebox.showinfo("算法对比", Portfolio.format_table(records))
 
     def run_all_searches(self, algorithm_name):
         """根据算法名称运行对应的搜索算法"""
-        algorithm_map = {
-            "DFS": DFS,
-            "BFS": BFS,
-            "Uniform Cost Search": UniformCostSearch,
-            "Greedy Search": GreedySearch,
-            "A* Search": AStarSearch
-        }
-
-        algorithm_class = algorithm_map.get(algorithm_name)
+        algorithm_class = ALGORITHMS.get(algorithm_name)
         if not algorithm_class:
             messagebox.showerror("错误", f"未知的搜索算法：{algorithm_name}")
             return
@@ -0,0 +1,149 @@
+# Portfolio.py
+"""并行算法组合
+
+在进程池中同时运行多个搜索算法，地图只放一份在共享内存中，各工作进程直接在共享缓冲区上建网格，不复制地图。
+两种模式：
+    race     —— 返回最先找到路径的算法结果，其余进程立即终止；
+    compare  —— 等所有算法结束，返回代价 / 扩展节点数 / 耗时的对比表。
+
+用法示例：
+    python Portfolio.py maze.map --mode race
+    python Portfolio.py maze.bmap --mode compare --algorithms BFS "A* Search" "Jump Point Search"
+"""
+
+import argparse
+from contextlib import contextmanager
+import json
+import multiprocessing
+from multiprocessing import shared_memory
+import os
+import sys
+import time
+
+from Grid import Grid
+from Headless import solve
+from Map_File import load_map
+from Search import ALGORITHMS, DEFAULT_ALGORITHMS
+
+# 工作进程中挂接的共享地图
+_worker = {}
+
+
+def _attach(name, width, height, start=None, goal=None):
+    """工作进程初始化：挂接共享内存，在共享缓冲区上直接构建网格"""
+    shm = shared_memory.SharedMemory(name=name)
+    size = (height + 2) * (width + 2)
+    _worker.update(shm=shm, grid=Grid(width, height, shm.buf[:size]), start=start, goal=goal)
+
+
+def worker_grid():
+    """工作进程中挂接的共享网格（供 shared_pool 进程池中执行的任务使用）"""
+    return _worker["grid"]
+
+
+def _run(task):
+    algorithm_name, include_path = task
+    try:
+        return solve(_worker["grid"], _worker["start"], _worker["goal"], algorithm_name, include_path)
+    except Exception as error:
+        # 工作进程中的异常会中止整个 map，只把它记为该算法的失败结果
+        return {"algorithm": algorithm_name, "found": False, "cost": -1, "expansions": 0,
+                "max_frontier": 0, "time_s": 0.0, "error": f"{type(error).__name__}: {error}"}
+
+
+@contextmanager
+def shared_pool(grid, processes, start=None, goal=None):
+    """把地图复制到共享内存一次，并启动挂接该地图的进程池；退出时终止进程池并释放共享内存"""
+    size = len(grid.passable)
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        shm.buf[:size] = grid.passable
+        pool = multiprocessing.Pool(processes, initializer=_attach,
+                                    initargs=(shm.name, grid.width, grid.height, start, goal))
+        try:
+            yield pool
+        finally:
+            pool.terminate()
+            pool.join()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def pool_size(tasks, workers):
+    return max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+
+
+def check_endpoints(start, goal):
+    if start is None or goal is None:
+        raise ValueError("地图中缺少起点或终点")
+
+
+def race(grid, start, goal, algorithms=None, workers=None, include_path=False):
+    """同时运行各算法（默认为 DEFAULT_ALGORITHMS），返回最先找到路径的结果；都找不到路径时返回 None"""
+    check_endpoints(start, goal)
+    algorithms = algorithms or DEFAULT_ALGORITHMS
+    tasks = [(name, include_path) for name in algorithms]
+    with shared_pool(grid, pool_size(algorithms, workers), start, goal) as pool:
+        for record in pool.imap_unordered(_run, tasks):
+            if record["found"]:
+                return record
+    return None
+
+
+def compare(grid, start, goal, algorithms=None, workers=None, include_path=False):
+    """同时运行各算法（默认为 DEFAULT_ALGORITHMS），全部结束后按 algorithms 的顺序返回结果列表"""
+    check_endpoints(start, goal)
+    algorithms = algorithms or DEFAULT_ALGORITHMS
+    tasks = [(name, include_path) for name in algorithms]
+    with shared_pool(grid, pool_size(algorithms, workers), start, goal) as pool:
+        return pool.map(_run, tasks)
+
+
+def format_table(records):
+    """把 compare 的结果排成对比表"""
+    lines = [f"{'algorithm':<22} {'cost':>8} {'expanded':>10} {'frontier':>9} {'time':>11}"]
+    for record in records:
+        line = (f"{record['algorithm']:<22} {record['cost']:>8} {record['expansions']:>10} "
+                f"{record['max_frontier']:>9} {record['time_s']:>10.4f}s")
+        if "error" in record:
+            line += f"  失败：{record['error']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="并行运行多个搜索算法")
+    parser.add_argument("map", help=".map 或 .bmap 地图文件")
+    parser.add_argument("--mode", choices=("race", "compare"), default="compare", help="运行模式")
+    parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS), help="参与的算法，默认为除 IDA*、SMA* 外的全部算法")
+    parser.add_argument("--workers", type=int, help="并行进程数，默认为 CPU 核数")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args(argv)
+
+    grid, start, goal = load_map(args.map)
+    begin = time.perf_counter()
+    if args.mode == "race":
+        result = race(grid, start, goal, args.algorithms, args.workers)
+    else:
+        result = compare(grid, start, goal, args.algorithms, args.workers)
+    elapsed = time.perf_counter() - begin
+
+    if args.json:
+        json.dump({"mode": args.mode, "wall_time_s": round(elapsed, 6), "results": result},
+                  sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    elif args.mode == "race":
+        if result is None:
+            print("没有算法找到路径")
+        else:
+            print(f"最先找到路径：{result['algorithm']}，代价 {result['cost']}，扩展 {result['expansions']} 个节点")
+    else:
+        print(format_table(result))
+    if not args.json:
+        print(f"总耗时 {elapsed:.4f}s")
+    return 0 if result else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
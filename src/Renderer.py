@@ -0,0 +1,301 @@
+# Renderer.py
+
+import numpy as np
+from PIL import Image, ImageTk
+
+
+class MapRenderer:
+    """地图渲染器基类
+
+    colors 为 符号 -> 填充颜色（"#rrggbb"），images 为 符号 -> PhotoImage（起点、终点、AGENT 等用图片显示的格子），
+    image_colors 为格子太小放不下图片时这些符号使用的颜色。
+    首次绘制、地图被替换或格子尺寸改变时完整绘制，之后只重绘发生变化的格子。
+    """
+    def __init__(self, canvas, cell_size, colors, images, default_color, image_colors=None):
+        self.canvas = canvas
+        self.cell_size = cell_size
+        self.colors = colors
+        self.images = images
+        self.default_color = default_color
+        self.image_colors = image_colors or {}
+        self.drawn_map = None
+        self.drawn_cell_size = None
+
+    def render(self, map_data, dirty=None):
+        """dirty 为 None 时完整绘制，否则只重绘 dirty 中的格子"""
+        if dirty is None or map_data is not self.drawn_map or self.cell_size != self.drawn_cell_size:
+            self.draw_all(map_data)
+            self.drawn_map = map_data
+            self.drawn_cell_size = self.cell_size
+            return
+        width = len(map_data[0]) if map_data else 0
+        for i, j in dirty:
+            self.draw_cell(map_data, i, j, width)
+
+    def color_of(self, cell):
+        """格子符号对应的填充颜色，用图片显示的符号取 image_colors 中的颜色"""
+        if cell in self.colors:
+            return self.colors[cell]
+        return self.image_colors.get(cell, self.default_color)
+
+    def build_palette(self):
+        """生成调色板（下标 -> RGB）和查找表（符号的字节值 -> 调色板下标）
+
+        下标 0 为默认颜色，之后依次为 colors 和 image_colors 中的符号，越靠后的下标优先级越高。
+        """
+        symbols = list(self.colors) + [s for s in self.image_colors if s not in self.colors]
+        palette = np.array([hex_to_rgb(self.default_color)] + [hex_to_rgb(self.color_of(s)) for s in symbols],
+                           dtype=np.uint8)
+        lookup = np.zeros(256, dtype=np.uint8)
+        for index, symbol in enumerate(symbols, start=1):
+            lookup[ord(symbol)] = index
+        return palette, lookup
+
+    def encode(self, map_data, lookup):
+        """把二维符号列表（符号均为单个 ASCII 字符）转换为调色板下标矩阵"""
+        if not map_data or not map_data[0]:
+            return np.zeros((len(map_data), 0), dtype=np.uint8)
+        return lookup[np.array([np.frombuffer("".join(row).encode("ascii"), dtype=np.uint8) for row in map_data])]
+
+    def cell_at(self, x, y):
+        """画布像素坐标对应的格子 (行, 列)"""
+        return (y // self.cell_size, x // self.cell_size)
+
+    def draw_all(self, map_data):
+        """完整绘制整张地图，需在子类中实现"""
+        raise NotImplementedError("必须在子类中实现此方法")
+
+    def draw_cell(self, map_data, i, j, width):
+        """按格子当前的符号重绘单个格子，需在子类中实现"""
+        raise NotImplementedError("必须在子类中实现此方法")
+
+
+def hex_to_rgb(color):
+    """"#rrggbb" 转换为 (r, g, b)"""
+    return tuple(int(color[k:k + 2], 16) for k in (1, 3, 5))
+
+
+def block_pixels(codes, palette, size, grid_lines):
+    """调色板下标矩阵放大为 RGB 位图，每个格子 size × size 像素，可选地在右边和下边画黑色网格线"""
+    pixels = np.repeat(np.repeat(palette[codes], size, axis=0), size, axis=1)
+    if grid_lines:
+        pixels[size - 1::size, :] = 0
+        pixels[:, size - 1::size] = 0
+    return pixels
+
+
+class CanvasRenderer(MapRenderer):
+    """逐格绘制的画布渲染器
+
+    每个格子的矩形只在完整绘制时创建一次，并按 (行, 列) 记录画布对象编号；
+    之后每帧只重新配置发生变化的格子，单帧开销与变化的格子数成正比，而与地图大小无关。
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cell_items = []  # 按行展开的矩形对象编号
+        self.image_items = {}  # (行, 列) -> 图片对象编号
+
+    def draw_all(self, map_data):
+        """清空画布并为每个格子创建画布对象"""
+        canvas = self.canvas
+        canvas.delete("all")
+        self.cell_items = []
+        self.image_items = {}
+        size = self.cell_size
+        for i, row in enumerate(map_data):
+            for j, cell in enumerate(row):
+                x1 = j * size
+                y1 = i * size
+                self.cell_items.append(canvas.create_rectangle(
+                    x1, y1, x1 + size, y1 + size, fill=self.colors.get(cell, self.default_color), outline="black"))
+                image = self.images.get(cell)
+                if image is not None:
+                    self.image_items[(i, j)] = canvas.create_image(x1 + size // 2, y1 + size // 2, image=image)
+
+    def draw_cell(self, map_data, i, j, width):
+        """按格子当前的符号重新配置它的画布对象"""
+        canvas = self.canvas
+        cell = map_data[i][j]
+        canvas.itemconfig(self.cell_items[i * width + j], fill=self.colors.get(cell, self.default_color))
+        image = self.images.get(cell)
+        item = self.image_items.pop((i, j), None)
+        if image is None:
+            if item is not None:
+                canvas.delete(item)
+            return
+        if item is None:
+            size = self.cell_size
+            item = canvas.create_image(j * size + size // 2, i * size + size // 2, image=image)
+        else:
+            canvas.itemconfig(item, image=image)
+        self.image_items[(i, j)] = item
+
+
+class RasterRenderer(MapRenderer):
+    """位图渲染器，适用于超大地图
+
+    用 NumPy 按颜色表把整张地图一次性生成为 RGB 位图（每个格子一个像素块），
+    作为单个 PhotoImage 放到画布上；之后每帧只对变化的格子所在的像素块调用 Tk 的 put / copy 进行修补。
+    格子不小于 GRID_LINE_SIZE 像素时保留黑色网格线，不小于 MIN_IMAGE_SIZE 像素时才贴图片。
+    """
+    GRID_LINE_SIZE = 4
+    MIN_IMAGE_SIZE = 8
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.photo = None
+
+    def draw_all(self, map_data):
+        """用颜色表生成整张地图的位图并放到画布上"""
+        size = self.cell_size
+        palette, lookup = self.build_palette()
+        pixels = block_pixels(self.encode(map_data, lookup), palette, size, size >= self.GRID_LINE_SIZE)
+
+        self.photo = ImageTk.PhotoImage(Image.fromarray(pixels, "RGB"))
+        self.canvas.delete("all")
+        self.canvas.create_image(0, 0, anchor="nw", image=self.photo)
+
+        if size >= self.MIN_IMAGE_SIZE:
+            for i, row in enumerate(map_data):
+                for j, cell in enumerate(row):
+                    if cell in self.images:
+                        self.paste_image(i, j, cell)
+
+    def paste_image(self, i, j, cell):
+        size = self.cell_size
+        self.canvas.tk.call(str(self.photo), "copy", str(self.images[cell]), "-to", j * size, i * size)
+
+    def draw_cell(self, map_data, i, j, width):
+        """修补单个格子的像素块"""
+        size = self.cell_size
+        cell = map_data[i][j]
+        inner = size - 1 if size >= self.GRID_LINE_SIZE else size
+        x1, y1 = j * size, i * size
+        self.canvas.tk.call(str(self.photo), "put", self.color_of(cell), "-to", x1, y1, x1 + inner, y1 + inner)
+        if cell in self.images and size >= self.MIN_IMAGE_SIZE:
+            self.paste_image(i, j, cell)
+
+
+class ViewportRenderer(MapRenderer):
+    """可滚动、可缩放的视口渲染器，适用于比屏幕大得多的地图
+
+    整张地图只保存为调色板下标矩阵（每格 1 字节），画布上只有一张视口大小的位图：
+    放大时每个格子占 cell_size × cell_size 像素，缩小到每像素不足一格时按 lod × lod 的格子块聚合成一个像素，
+    块内取优先级最高（调色板下标最大）的符号，保证路径和 AGENT 在缩小后仍然可见。
+    因此内存和重绘时间都只与视口大小有关，与地图大小无关。起点、终点和 AGENT 用 image_colors 中的颜色显示。
+    """
+    GRID_LINE_SIZE = 4
+    MAX_CELL_SIZE = 64
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.view_width = 800  # 视口的像素尺寸
+        self.view_height = 600
+        self.lod = 1  # 每个像素块聚合的格子数（边长）
+        self.origin = (0, 0)  # 视口左上角的格子
+        self.codes = None
+        self.palette = None
+        self.lookup = None
+        self.photo = None
+
+    def draw_all(self, map_data):
+        """重新编码整张地图并绘制视口"""
+        self.palette, self.lookup = self.build_palette()
+        self.codes = self.encode(map_data, self.lookup)
+        self.redraw()
+
+    def visible_cells(self):
+        """视口能容纳的格子行数和列数"""
+        size, lod = self.cell_size, self.lod
+        return -(-self.view_height // size) * lod, -(-self.view_width // size) * lod
+
+    def clamp_origin(self, i0, j0):
+        """限制视口不超出地图范围"""
+        rows, cols = self.visible_cells()
+        height, width = self.codes.shape
+        return (max(0, min(i0, height - rows)), max(0, min(j0, width - cols)))
+
+    def redraw(self):
+        """按当前位置和缩放级别重新生成视口位图"""
+        if self.codes is None:
+            return
+        size, lod = self.cell_size, self.lod
+        rows, cols = self.visible_cells()
+        self.origin = i0, j0 = self.clamp_origin(*self.origin)
+        block = self.codes[i0:i0 + rows, j0:j0 + cols]
+        if lod > 1 and block.size:
+            # 补齐到 lod 的整数倍后按块取最大下标
+            pad_rows = -block.shape[0] % lod
+            pad_cols = -block.shape[1] % lod
+            block = np.pad(block, ((0, pad_rows), (0, pad_cols)))
+            block = block.reshape(block.shape[0] // lod, lod, block.shape[1] // lod, lod).max(axis=(1, 3))
+        pixels = block_pixels(block, self.palette, size, size >= self.GRID_LINE_SIZE)
+        self.photo = ImageTk.PhotoImage(Image.fromarray(pixels, "RGB"))
+        self.canvas.delete("all")
+        self.canvas.create_image(0, 0, anchor="nw", image=self.photo)
+
+    def draw_cell(self, map_data, i, j, width):
+        """更新格子的编码，格子在视口内时修补对应的像素块"""
+        self.codes[i, j] = self.lookup[ord(map_data[i][j])]
+        size, lod = self.cell_size, self.lod
+        i0, j0 = self.origin
+        rows, cols = self.visible_cells()
+        if not (i0 <= i < i0 + rows and j0 <= j < j0 + cols):
+            return
+        bi, bj = (i - i0) // lod, (j - j0) // lod
+        ci, cj = i0 + bi * lod, j0 + bj * lod
+        code = self.codes[ci:ci + lod, cj:cj + lod].max()
+        inner = size - 1 if size >= self.GRID_LINE_SIZE else size
+        x1, y1 = bj * size, bi * size
+        color = "#%02x%02x%02x" % tuple(int(c) for c in self.palette[code])
+        self.canvas.tk.call(str(self.photo), "put", color, "-to", x1, y1, x1 + inner, y1 + inner)
+
+    def cell_at(self, x, y):
+        """画布像素坐标对应的格子；聚合显示时一个像素对应多个格子，返回 None"""
+        if self.lod > 1:
+            return None
+        return (self.origin[0] + y // self.cell_size, self.origin[1] + x // self.cell_size)
+
+    def resize(self, width, height):
+        """视口的像素尺寸改变"""
+        if (width, height) != (self.view_width, self.view_height):
+            self.view_width, self.view_height = max(width, 1), max(height, 1)
+            self.redraw()
+
+    def scroll(self, rows, cols):
+        """视口平移若干格"""
+        self.origin = (self.origin[0] + rows, self.origin[1] + cols)
+        self.redraw()
+
+    def zoom(self, steps, x=0, y=0):
+        """以像素坐标 (x, y) 为中心缩放，steps 为正时放大、为负时缩小，每级缩放两倍"""
+        if self.codes is None:
+            return
+        size, lod = self.cell_size, self.lod
+        ci = self.origin[0] + y // size * lod
+        cj = self.origin[1] + x // size * lod
+        # 缩小到整张地图都能放进视口为止
+        height, width = self.codes.shape
+        max_lod = max(1, -(-height // self.view_height), -(-width // self.view_width))
+        for _ in range(abs(steps)):
+            if steps > 0:
+                if lod > 1:
+                    lod //= 2
+                elif size * 2 <= self.MAX_CELL_SIZE:
+                    size *= 2
+            elif size > 1:
+                size //= 2
+            elif lod < max_lod:
+                lod *= 2
+        self.cell_size = self.drawn_cell_size = size
+        self.lod = lod
+        self.origin = (ci - y // size * lod, cj - x // size * lod)
+        self.redraw()
+
+
+# 可用的渲染后端
+RENDERERS = {
+    "canvas": CanvasRenderer,
+    "raster": RasterRenderer,
+    "viewport": ViewportRenderer,
+}
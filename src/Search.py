@@ -1,7 +1,13 @@
 # Search.py
 
+from array import array
 from collections import deque
 import heapq
+import time
+
+from Grid import Grid
+from Hierarchical import DEFAULT_CLUSTER_SIZE, HIERARCHIES
+from Landmarks import DEFAULT_LANDMARKS, LANDMARKS
 
 # 定义地图符号
 WALL = '1'
@@ -9,74 +15,258 @@ ROAD = '0'
 START = '@'
 GOAL = '$'
 
+# 可选的优先队列实现
+FRONTIERS = ("heap", "bucket")
+# 内存受限搜索（IDA*、SMA*）默认的节点预算
+DEFAULT_NODE_BUDGET = 200000
+# SMA* 的扩展次数上限（网格格子数的倍数），超过时认为节点预算不足，反复遗忘和重新生成节点而无进展
+SMA_EXPANSION_FACTOR = 16
+# ARA* 的初始权重与每轮减小的步长
+ARA_WEIGHT = 3.0
+ARA_WEIGHT_STEP = 0.5
+
+
+class BucketQueue:
+    """整数优先级的桶队列（Dial 算法）
+
+    优先级为小整数且出队优先级单调不减时（单位代价 + 一致启发式），
+    push / pop 都是均摊 O(1)。tie_break 为 True 时，同一优先级内再按次级键
+    （如 h 值）从小到大出队，否则按后进先出出队：每个桶是 (次级键的小根堆, 次级键 -> 元素列表)，
+    只为实际出现的次级键建列表。
+    """
+    def __init__(self, tie_break=False):
+        self.tie_break = tie_break
+        self.buckets = []
+        self.current = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def push(self, priority, item, secondary=0):
+        buckets = self.buckets
+        if len(buckets) <= priority:
+            buckets.extend([None] * (priority + 1 - len(buckets)))
+        bucket = buckets[priority]
+        if self.tie_break:
+            if bucket is None:
+                bucket = buckets[priority] = ([], {})
+            keys, items = bucket
+            same = items.get(secondary)
+            if same is None:
+                items[secondary] = [item]
+                heapq.heappush(keys, secondary)
+            else:
+                same.append(item)
+        elif bucket is None:
+            buckets[priority] = [item]
+        else:
+            bucket.append(item)
+        if priority < self.current:
+            self.current = priority
+        self.count += 1
+
+    def pop(self):
+        """弹出优先级最小的元素，返回 (priority, item)"""
+        buckets = self.buckets
+        while not buckets[self.current]:
+            self.current += 1  # 空桶为 None 或空列表；tie_break 的桶取空后置为 None
+        bucket = buckets[self.current]
+        if self.tie_break:
+            keys, items = bucket
+            secondary = keys[0]
+            same = items[secondary]
+            item = same.pop()
+            if not same:
+                del items[secondary]
+                heapq.heappop(keys)
+                if not keys:
+                    buckets[self.current] = None
+        else:
+            item = bucket.pop()
+        self.count -= 1
+        return self.current, item
+
+
+class SearchStats:
+    """一次搜索的统计信息
+
+    搜索算法只在出队时调用 popped，启用统计时才有开销；未启用时（stats 为 None）只多一次判断。
+    入队次数由相邻两次出队之间开放列表大小的变化推算，开放列表峰值在出队前取得。
+    各阶段耗时只统计生成器内部花费的时间，不含界面动画的等待。
+    callback 不为空时，每扩展 every 个节点以及搜索结束时调用一次 callback(stats)。
+    """
+    def __init__(self, callback=None, every=1000):
+        self.expansions = 0
+        self.pushes = 0
+        self.stale_pops = 0
+        self.max_frontier = 0
+        self.frontier_size = 0  # 上次出队后开放列表的大小
+        self.phase_times = {}
+        self.finished = False
+        self.callback = callback
+        self.every = every
+
+    def popped(self, size, stale=False):
+        """出队时调用，size 为出队前开放列表的大小，stale 表示弹出的是过期或重复的条目"""
+        self.pushes += size - self.frontier_size
+        self.frontier_size = size - 1
+        if size > self.max_frontier:
+            self.max_frontier = size
+        if stale:
+            self.stale_pops += 1
+            return
+        self.expansions += 1
+        if self.callback and self.expansions % self.every == 0:
+            self.callback(self)
+
+    def finish(self, size):
+        """搜索不是在出队后立即结束时调用，补记最后一次出队之后的入队"""
+        self.pushes += size - self.frontier_size
+        self.frontier_size = size
+        if size > self.max_frontier:
+            self.max_frontier = size
+
+    def add_time(self, phase, seconds):
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + seconds
+
+    def track(self, cells):
+        """包装逐步搜索的生成器，分阶段累计生成器内部的耗时"""
+        clock = time.perf_counter
+        try:
+            while True:
+                begin = clock()
+                try:
+                    result = next(cells)
+                except StopIteration:
+                    return
+                if isinstance(result, list):
+                    self.add_time("path", clock() - begin)
+                    self.finished = True
+                    if self.callback:
+                        self.callback(self)
+                else:
+                    self.add_time("search", clock() - begin)
+                yield result
+        finally:
+            cells.close()
+
+    def as_dict(self):
+        return {
+            "expansions": self.expansions,
+            "pushes": self.pushes,
+            "stale_pops": self.stale_pops,
+            "max_frontier": self.max_frontier,
+            "phase_times": dict(self.phase_times),
+        }
+
+    def summary(self):
+        """适合在界面上显示的一行统计信息"""
+        elapsed = sum(self.phase_times.values()) * 1000
+        return (f"扩展: {self.expansions}  入队: {self.pushes}  过期出队: {self.stale_pops}  "
+                f"开放列表峰值: {self.max_frontier}  用时: {elapsed:.1f} ms")
+
+
 class SearchAlgorithm:
-    """基类，定义搜索算法的接口"""
-    def __init__(self, map_data, start, goal):
+    """基类，定义搜索算法的接口
+
+    map_data 可以是二维符号列表，也可以是已经构建好的 Grid；
+    搜索在 Grid 的线性格子编号上进行，对外仍以 (i, j) 坐标返回结果。
+    stats 为可选的 SearchStats，用于收集扩展数、入队数、开放列表峰值与各阶段耗时。
+    """
+    anytime = False  # 为 True 时逐步搜索会产出多条逐渐变好的路径，最后一条最好
+    in_defaults = True  # 为 False 时不参加未指定算法时的“全部算法”运行（批处理、基准测试、并行对比）
+
+    def __init__(self, map_data, start, goal, stats=None):
+        begin = time.perf_counter()
+        self.stats = stats
         self.map_data = map_data
+        self.grid = map_data if isinstance(map_data, Grid) else Grid.from_map_data(map_data)
         self.start = start
         self.goal = goal
-        self.height = len(map_data)
-        self.width = len(map_data[0]) if self.height > 0 else 0
+        self.start_id = self.grid.to_id(start)
+        self.goal_id = self.grid.to_id(goal)
+        self.height = self.grid.height
+        self.width = self.grid.width
+        if stats is not None:
+            stats.add_time("setup", time.perf_counter() - begin)
 
     def get_neighbors(self, position):
         """获取当前位置的可行邻居"""
-        i, j = position
-        neighbors = []
-        directions = [(-1,0), (1,0), (0,-1), (0,1)]  # 上下左右
-
-        for di, dj in directions:
-            ni, nj = i + di, j + dj
-            if 0 <= ni < self.height and 0 <= nj < self.width:
-                if self.map_data[ni][nj] in [ROAD, GOAL, START]:
-                    neighbors.append((ni, nj))
-        return neighbors
+        grid = self.grid
+        return [grid.to_pos(cell) for cell in grid.neighbors(grid.to_id(position))]
 
     def reconstruct_path(self, parent, current):
-        """重建路径从起点到终点"""
+        """重建路径从起点到终点（parent 按格子编号索引，current 为格子编号）"""
         path = []
-        while current != self.start:
+        while current != self.start_id:
             path.append(current)
-            current = parent.get(current)
-            if current is None:
+            current = parent[current]
+            if current < 0:
                 return []  # 无法到达
-        path.append(self.start)
+        path.append(self.start_id)
         path.reverse()
-        return path
+        to_pos = self.grid.to_pos
+        return [to_pos(cell) for cell in path]
 
-    def heuristic(self, position):
+    def heuristic(self, cell):
         """启发式函数，默认不使用"""
         return 0
 
     def search(self):
-        """执行搜索，需在子类中实现"""
-        raise NotImplementedError("必须在子类中实现此方法")
+        """执行完整搜索，返回最终路径（找不到时为空列表）"""
+        result = []
+        for result in self.run_cells():
+            pass
+        return result
 
     def step_search(self):
-        """执行逐步搜索，需在子类中实现"""
+        """执行逐步搜索，依次返回扩展节点的坐标，最后返回路径"""
+        to_pos = self.grid.to_pos
+        for result in self.run_cells():
+            if isinstance(result, list):
+                yield result
+                return
+            yield to_pos(result)
+
+    def run_cells(self):
+        """以格子编号逐步搜索，启用统计时套上统计包装"""
+        cells = self.step_search_cells()
+        return cells if self.stats is None else self.stats.track(cells)
+
+    def step_search_cells(self):
+        """以格子编号执行逐步搜索，需在子类中实现"""
         raise NotImplementedError("必须在子类中实现此方法")
 class DFS(SearchAlgorithm):
     """深度优先搜索算法"""
-    def step_search(self):
-        stack = []
-        visited = set()
-        parent = {}
+    def step_search_cells(self):
+        passable = self.grid.passable
+        offsets = self.grid.offsets
+        stats = self.stats
+        goal = self.goal_id
+        with self.grid.search_state() as state:
+            parent, mark, seen = state.parent, state.mark, state.seen
+            stack = []
 
-        stack.append(self.start)
-        visited.add(self.start)
+            stack.append(self.start_id)
+            mark[self.start_id] = seen
 
-        while stack:
-            current = stack.pop()
-            yield current  # 返回当前节点以进行可视化
+            while stack:
+                current = stack.pop()
+                if stats:
+                    stats.popped(len(stack) + 1)
+                yield current  # 返回当前节点以进行可视化
 
-            if current == self.goal:
-                path = self.reconstruct_path(parent, current)
-                yield path  # 返回最终路径
-                return
-            for neighbor in self.get_neighbors(current):
-                if neighbor not in visited:
-                    stack.append(neighbor)
-                    visited.add(neighbor)
-                    parent[neighbor] = current
+                if current == goal:
+                    path = self.reconstruct_path(parent, current)
+                    yield path  # 返回最终路径
+                    return
+                for offset in offsets:
+                    neighbor = current + offset
+                    if passable[neighbor] and mark[neighbor] < seen:
+                        stack.append(neighbor)
+                        mark[neighbor] = seen
+                        parent[neighbor] = current
 
         yield []  # 没有找到路径
 
@@ -84,125 +274,1164 @@ class DFS(SearchAlgorithm):
 
 class BFS(SearchAlgorithm):
     """广度优先搜索算法"""
-    def step_search(self):
-        queue = deque()
-        visited = set()
-        parent = {}
+    def step_search_cells(self):
+        passable = self.grid.passable
+        offsets = self.grid.offsets
+        stats = self.stats
+        goal = self.goal_id
+        with self.grid.search_state() as state:
+            parent, mark, seen = state.parent, state.mark, state.seen
+            queue = deque()
 
-        queue.append(self.start)
-        visited.add(self.start)
+            queue.append(self.start_id)
+            mark[self.start_id] = seen
+
+            while queue:
+                current = queue.popleft()
+                if stats:
+                    stats.popped(len(queue) + 1)
+                yield current  # 返回当前节点以进行可视化
+
+                if current == goal:
+                    path = self.reconstruct_path(parent, current)
+                    yield path  # 返回最终路径
+                    return
+                for offset in offsets:
+                    neighbor = current + offset
+                    if passable[neighbor] and mark[neighbor] < seen:
+                        queue.append(neighbor)
+                        mark[neighbor] = seen
+                        parent[neighbor] = current
+
+        yield []  # 没有找到路径
+
+
+
+class UniformCostSearch(SearchAlgorithm):
+    """统一代价搜索算法
+
+    frontier="bucket" 时使用桶队列代替 heapq，并跳过过期的重复条目。
+    """
+    def __init__(self, map_data, start, goal, frontier="heap", stats=None):
+        super().__init__(map_data, start, goal, stats)
+        if frontier not in FRONTIERS:
+            raise ValueError(f"未知的优先队列类型：{frontier}")
+        self.frontier = frontier
+
+    def step_search_cells(self):
+        if self.frontier == "bucket":
+            return self.bucket_search_cells()
+        return self.heap_search_cells()
+
+    def heap_search_cells(self):
+        passable = self.grid.passable
+        offsets = self.grid.offsets
+        stats = self.stats
+        goal = self.goal_id
+        with self.grid.search_state() as state:
+            parent, cost_so_far, mark = state.parent, state.cost, state.mark
+            seen, closed = state.seen, state.closed
+            heap = []
+            heapq.heappush(heap, (0, self.start_id))
+            cost_so_far[self.start_id] = 0
+            mark[self.start_id] = seen
+
+            while heap:
+                current_cost, current = heapq.heappop(heap)
+                if stats:
+                    stats.popped(len(heap) + 1, mark[current] == closed)
+                yield current  # 返回当前节点以进行可视化
+
+                if current == goal:
+                    path = self.reconstruct_path(parent, current)
+                    yield path  # 返回最终路径
+                    return
+                if mark[current] == closed:
+                    continue
+                mark[current] = closed
+                for offset in offsets:
+                    neighbor = current + offset
+                    if not passable[neighbor]:
+                        continue
+                    new_cost = current_cost + 1  # 假设每步代价为1
+                    if mark[neighbor] < seen or new_cost < cost_so_far[neighbor]:
+                        if mark[neighbor] < seen:
+                            mark[neighbor] = seen
+                        cost_so_far[neighbor] = new_cost
+                        heapq.heappush(heap, (new_cost, neighbor))
+                        parent[neighbor] = current
+
+        yield []  # 没有找到路径
+
+
+
+    def bucket_search_cells(self):
+        passable = self.grid.passable
+        offsets = self.grid.offsets
+        stats = self.stats
+        goal = self.goal_id
+        with self.grid.search_state() as state:
+            parent, cost_so_far, mark = state.parent, state.cost, state.mark
+            seen, closed = state.seen, state.closed
+            queue = BucketQueue()
+            queue.push(0, self.start_id)
+            cost_so_far[self.start_id] = 0
+            mark[self.start_id] = seen
+
+            while queue:
+                current_cost, current = queue.pop()
+                if stats:
+                    stats.popped(len(queue) + 1, mark[current] == closed)
+                if mark[current] == closed:
+                    continue  # 过期的重复条目
+                yield current  # 返回当前节点以进行可视化
+
+                if current == goal:
+                    path = self.reconstruct_path(parent, current)
+                    yield path  # 返回最终路径
+                    return
+                mark[current] = closed
+                for offset in offsets:
+                    neighbor = current + offset
+                    if not passable[neighbor]:
+                        continue
+                    new_cost = current_cost + 1  # 假设每步代价为1
+                    if mark[neighbor] < seen or new_cost < cost_so_far[neighbor]:
+                        if mark[neighbor] < seen:
+                            mark[neighbor] = seen
+                        cost_so_far[neighbor] = new_cost
+                        queue.push(new_cost, neighbor)
+                        parent[neighbor] = current
+
+        yield []  # 没有找到路径
+
+class GreedySearch(SearchAlgorithm):
+    """贪心搜索算法
+
+    每个格子只在第一次被发现时入队，父节点不再被后来的发现覆盖；
+    tie_break 为 True 时 h 值相同的节点中优先扩展 g 更大（离起点更远）的节点。
+    """
+    def __init__(self, map_data, start, goal, tie_break=False, stats=None):
+        super().__init__(map_data, start, goal, stats)
+        self.tie_break = tie_break
+
+    def heuristic(self, cell):
+        """使用曼哈顿距离作为启发式函数"""
+        return self.grid.manhattan(cell, self.goal_id)
+
+    def step_search_cells(self):
+        passable = self.grid.passable
+        offsets = self.grid.offsets
+        stats = self.stats
+        goal = self.goal_id
+        heuristic = self.heuristic
+        tie_break = self.tie_break
+        with self.grid.search_state() as state:
+            parent, cost, mark, seen = state.parent, state.cost, state.mark, state.seen
+            heap = []
+            heapq.heappush(heap, (heuristic(self.start_id), 0, self.start_id))
+            cost[self.start_id] = 0
+            mark[self.start_id] = seen
+
+            while heap:
+                _, _, current = heapq.heappop(heap)
+                if stats:
+                    stats.popped(len(heap) + 1)
+                yield current  # 返回当前节点以进行可视化
+
+                if current == goal:
+                    path = self.reconstruct_path(parent, current)
+                    yield path  # 返回最终路径
+                    return
+                new_cost = cost[current] + 1
+                for offset in offsets:
+                    neighbor = current + offset
+                    if passable[neighbor] and mark[neighbor] < seen:
+                        mark[neighbor] = seen
+                        parent[neighbor] = current
+                        cost[neighbor] = new_cost
+                        heapq.heappush(heap, (heuristic(neighbor), -new_cost if tie_break else 0, neighbor))
+
+        yield []  # 没有找到路径
+
+
+
+class AStarSearch(SearchAlgorithm):
+    """A* 搜索算法
+
+    frontier="bucket" 时使用以 f 值分桶的桶队列代替 heapq（要求启发式取整数且一致），
+    tie_break 为 True 时同一 f 值内优先扩展 h 更小（即 g 更大）的节点，沿最短路径方向直奔终点，
+    为 False 时优先扩展 g 更小的节点，在开阔地图上会扩展整片 f 值相同的区域。
+    已扩展节点的过期条目出队时直接跳过，不计入扩展。
+    landmarks 为同一地图的 Landmarks.LandmarkTable 时改用 ALT 地标启发式。
+    """
+    def __init__(self, map_data, start, goal, frontier="heap", tie_break=True, stats=None, landmarks=None):
+        super().__init__(map_data, start, goal, stats)
+        if frontier not in FRONTIERS:
+            raise ValueError(f"未知的优先队列类型：{frontier}")
+        self.frontier = frontier
+        self.tie_break = tie_break
+        if landmarks is not None:
+            self.use_landmarks(landmarks)
+
+    def heuristic(self, cell):
+        """使用曼哈顿距离作为启发式函数"""
+        return self.grid.manhattan(cell, self.goal_id)
+
+    def use_landmarks(self, landmarks):
+        """改用地标启发式：每个格子的值在入队时由地标距离表的终点列算出"""
+        self.heuristic = landmarks.heuristic(self.goal_id)
+
+    def step_search_cells(self):
+        if self.frontier == "bucket":
+            return self.bucket_search_cells()
+        return self.heap_search_cells()
+
+    def heap_search_cells(self):
+        passable = self.grid.passable
+        offsets = self.grid.offsets
+        stats = self.stats
+        goal = self.goal_id
+        heuristic = self.heuristic
+        tie_break = self.tie_break
+        with self.grid.search_state() as state:
+            parent, cost_so_far, mark = state.parent, state.cost, state.mark
+            seen, closed = state.seen, state.closed
+            heap = []
+            h = heuristic(self.start_id)
+            # 条目为 (f, 次级键, g, 格子)，次级键为 h（tie_break）或 g
+            heapq.heappush(heap, (h, h if tie_break else 0, 0, self.start_id))
+            cost_so_far[self.start_id] = 0
+            mark[self.start_id] = seen
+
+            while heap:
+                _, _, current_cost, current = heapq.heappop(heap)
+                if stats:
+                    stats.popped(len(heap) + 1, mark[current] == closed)
+                if mark[current] == closed:
+                    continue  # 过期的重复条目
+                yield current  # 返回当前节点以进行可视化
+
+                if current == goal:
+                    path = self.reconstruct_path(parent, current)
+                    yield path  # 返回最终路径
+                    return
+                mark[current] = closed
+                for offset in offsets:
+                    neighbor = current + offset
+                    if not passable[neighbor]:
+                        continue
+                    new_cost = current_cost + 1  # 假设每步代价为1
+                    if mark[neighbor] < seen or new_cost < cost_so_far[neighbor]:
+                        if mark[neighbor] < seen:
+                            mark[neighbor] = seen
+                        cost_so_far[neighbor] = new_cost
+                        h = heuristic(neighbor)
+                        heapq.heappush(heap, (new_cost + h, h if tie_break else new_cost, new_cost, neighbor))
+                        parent[neighbor] = current
+
+        yield []  # 没有找到路径
+
+    def bucket_search_cells(self):
+        passable = self.grid.passable
+        offsets = self.grid.offsets
+        stats = self.stats
+        goal = self.goal_id
+        heuristic = self.heuristic
+        with self.grid.search_state() as state:
+            parent, cost_so_far, mark = state.parent, state.cost, state.mark
+            seen, closed = state.seen, state.closed
+            queue = BucketQueue(self.tie_break)
+            h = heuristic(self.start_id)
+            queue.push(h, self.start_id, h)
+            cost_so_far[self.start_id] = 0
+            mark[self.start_id] = seen
+
+            while queue:
+                _, current = queue.pop()
+                if stats:
+                    stats.popped(len(queue) + 1, mark[current] == closed)
+                if mark[current] == closed:
+                    continue  # 过期的重复条目
+                yield current  # 返回当前节点以进行可视化
+
+                if current == goal:
+                    path = self.reconstruct_path(parent, current)
+                    yield path  # 返回最终路径
+                    return
+                mark[current] = closed
+                current_cost = cost_so_far[current]
+                for offset in offsets:
+                    neighbor = current + offset
+                    if not passable[neighbor]:
+                        continue
+                    new_cost = current_cost + 1  # 假设每步代价为1
+                    if mark[neighbor] < seen or new_cost < cost_so_far[neighbor]:
+                        if mark[neighbor] < seen:
+                            mark[neighbor] = seen
+                        cost_so_far[neighbor] = new_cost
+                        h = heuristic(neighbor)
+                        queue.push(new_cost + h, neighbor, h)
+                        parent[neighbor] = current
+
+        yield []  # 没有找到路径
+
+
+
+class ALTSearch(AStarSearch):
+    """使用 ALT 地标启发式的 A* 搜索
+
+    地标距离表按地图内容哈希缓存在内存和磁盘中（Landmarks.LANDMARKS），同一地图上的后续查询不再重新计算。
+    """
+    def __init__(self, map_data, start, goal, frontier="heap", tie_break=True, stats=None,
+                 count=DEFAULT_LANDMARKS):
+        super().__init__(map_data, start, goal, frontier, tie_break, stats)
+        begin = time.perf_counter()
+        self.use_landmarks(LANDMARKS.get(self.grid, count))
+        if stats is not None:
+            stats.add_time("setup", time.perf_counter() - begin)
+
+
+class HPAStarSearch(SearchAlgorithm):
+    """分层 A*（HPA*）搜索
+
+    在 Hierarchical.HierarchicalPlanner 的抽象图上搜索后逐段细化为格子路径，路径接近最短但不保证最短。
+    规划器按网格缓存在 Hierarchical.HIERARCHIES 中，同一地图上的后续查询不再重新构建；
+    逐步搜索时返回被扩展的抽象节点。
+    """
+    def __init__(self, map_data, start, goal, stats=None, cluster_size=DEFAULT_CLUSTER_SIZE):
+        super().__init__(map_data, start, goal, stats)
+        begin = time.perf_counter()
+        self.planner = HIERARCHIES.get(self.grid, cluster_size)
+        if stats is not None:
+            stats.add_time("setup", time.perf_counter() - begin)
+
+    def step_search_cells(self):
+        planner = self.planner
+        abstract = []
+        for abstract in planner.abstract_steps(self.start_id, self.goal_id, self.stats):
+            if isinstance(abstract, list):
+                break
+            yield abstract
+        if not abstract:
+            yield []  # 没有找到路径
+            return
+        cells = [abstract[0]]
+        for segment in planner.refine_segments(abstract):
+            cells.extend(segment)
+        to_pos = self.grid.to_pos
+        yield [to_pos(cell) for cell in cells]
 
-        while queue:
-            current = queue.popleft()
-            yield current  # 返回当前节点以进行可视化
 
-            if current == self.goal:
-                path = self.reconstruct_path(parent, current)
+class JumpPointSearch(SearchAlgorithm):
+    """跳点搜索（JPS）算法，适用于四连通的单位代价网格
+
+    沿直线方向跳过对称路径上的中间格子，只把跳点放入开放列表，
+    返回的路径代价与 A* 相同，逐步搜索时只返回被扩展的跳点。
+    """
+    def heuristic(self, cell):
+        """使用曼哈顿距离作为启发式函数"""
+        return self.grid.manhattan(cell, self.goal_id)
+
+    def jump(self, cell, step):
+        """从 cell 沿 step 方向跳跃，返回遇到的跳点编号，撞墙时返回 -1"""
+        passable = self.grid.passable
+        goal = self.goal_id
+        if step == 1 or step == -1:
+            up, down = -self.grid.stride, self.grid.stride
+            while True:
+                cell += step
+                if not passable[cell]:
+                    return -1
+                if cell == goal:
+                    return cell
+                # 上方或下方出现强制邻居
+                if (passable[cell + up] and not passable[cell - step + up]) or \
+                        (passable[cell + down] and not passable[cell - step + down]):
+                    return cell
+        while True:
+            cell += step
+            if not passable[cell]:
+                return -1
+            if cell == goal:
+                return cell
+            # 左侧或右侧出现强制邻居
+            if (passable[cell - 1] and not passable[cell - step - 1]) or \
+                    (passable[cell + 1] and not passable[cell - step + 1]):
+                return cell
+            # 纵向移动时，还需检查横向能否跳到跳点
+            if self.jump(cell, 1) >= 0 or self.jump(cell, -1) >= 0:
+                return cell
+
+    def pruned_directions(self, cell, parent_cell):
+        """根据到达方向裁剪需要探索的方向"""
+        stride = self.grid.stride
+        if parent_cell < 0:
+            return self.grid.offsets
+        diff = cell - parent_cell
+        if -stride < diff < stride:
+            step = 1 if diff > 0 else -1
+            return (step, -stride, stride)
+        step = stride if diff > 0 else -stride
+        return (step, -1, 1)
+
+    def reconstruct_path(self, parent, current):
+        """重建跳点路径，并把相邻跳点之间的直线段展开为完整路径"""
+        jump_points = super().reconstruct_path(parent, current)
+        if len(jump_points) < 2:
+            return jump_points
+        path = [jump_points[0]]
+        for (i1, j1), (i2, j2) in zip(jump_points, jump_points[1:]):
+            di = (i2 > i1) - (i2 < i1)
+            dj = (j2 > j1) - (j2 < j1)
+            i, j = i1, j1
+            while (i, j) != (i2, j2):
+                i, j = i + di, j + dj
+                path.append((i, j))
+        return path
+
+    def step_search_cells(self):
+        passable = self.grid.passable
+        goal = self.goal_id
+        stats = self.stats
+        with self.grid.search_state() as state:
+            parent, cost_so_far, mark = state.parent, state.cost, state.mark
+            seen, closed = state.seen, state.closed
+            heap = []
+            heapq.heappush(heap, (self.heuristic(self.start_id), 0, self.start_id))
+            cost_so_far[self.start_id] = 0
+            parent[self.start_id] = -1
+            mark[self.start_id] = seen
+
+            while heap:
+                _, current_cost, current = heapq.heappop(heap)
+                if stats:
+                    stats.popped(len(heap) + 1, mark[current] == closed)
+                if mark[current] == closed:
+                    continue  # 过期的重复条目
+                yield current  # 返回当前跳点以进行可视化
+
+                if current == goal:
+                    path = self.reconstruct_path(parent, current)
+                    yield path  # 返回最终路径
+                    return
+                mark[current] = closed
+                for step in self.pruned_directions(current, parent[current]):
+                    if not passable[current + step]:
+                        continue
+                    jump_point = self.jump(current, step)
+                    if jump_point < 0:
+                        continue
+                    new_cost = current_cost + self.grid.manhattan(current, jump_point)
+                    if mark[jump_point] < seen or new_cost < cost_so_far[jump_point]:
+                        if mark[jump_point] < seen:
+                            mark[jump_point] = seen
+                        cost_so_far[jump_point] = new_cost
+                        priority = new_cost + self.heuristic(jump_point)
+                        heapq.heappush(heap, (priority, new_cost, jump_point))
+                        parent[jump_point] = current
+
+        yield []  # 没有找到路径
+
+
+
+class BidirectionalSearch(SearchAlgorithm):
+    """双向搜索的基类：从起点和终点同时搜索，在中间相遇"""
+    def join_path(self, forward_parent, backward_parent, meet):
+        """拼接前向路径（起点到相遇点）与后向路径（相遇点到终点）"""
+        path = self.reconstruct_path(forward_parent, meet)
+        if not path:
+            return []
+        to_pos = self.grid.to_pos
+        current = meet
+        while current != self.goal_id:
+            current = backward_parent[current]
+            if current < 0:
+                return []
+            path.append(to_pos(current))
+        return path
+
+
+
+class BidirectionalBFS(BidirectionalSearch):
+    """双向广度优先搜索算法
+
+    每次把较小一侧的整层节点扩展完；某一层出现相遇后，取该层所有相遇点中
+    两侧深度之和最小者，保证得到最短路径。
+    """
+    def step_search_cells(self):
+        passable = self.grid.passable
+        offsets = self.grid.offsets
+        stats = self.stats
+        with self.grid.search_state() as forward, self.grid.search_state() as backward:
+            forward_queue = deque([self.start_id])
+            backward_queue = deque([self.goal_id])
+            for state, cell in ((forward, self.start_id), (backward, self.goal_id)):
+                state.mark[cell] = state.seen
+                state.cost[cell] = 0
+            best, meet = -1, -1
+            if self.start_id == self.goal_id:
+                best, meet = 0, self.start_id
+
+            while best < 0 and forward_queue and backward_queue:
+                # 扩展较小一侧的一整层
+                if len(forward_queue) <= len(backward_queue):
+                    queue, own, other = forward_queue, forward, backward
+                else:
+                    queue, own, other = backward_queue, backward, forward
+                parent, cost, mark, seen = own.parent, own.cost, own.mark, own.seen
+                other_cost, other_mark, other_seen = other.cost, other.mark, other.seen
+                for _ in range(len(queue)):
+                    current = queue.popleft()
+                    if stats:
+                        stats.popped(len(forward_queue) + len(backward_queue) + 1)
+                    yield current  # 返回当前节点以进行可视化
+
+                    depth = cost[current] + 1
+                    for offset in offsets:
+                        neighbor = current + offset
+                        if passable[neighbor] and mark[neighbor] < seen:
+                            queue.append(neighbor)
+                            mark[neighbor] = seen
+                            cost[neighbor] = depth
+                            parent[neighbor] = current
+                            if other_mark[neighbor] >= other_seen:
+                                total = depth + other_cost[neighbor]
+                                if best < 0 or total < best:
+                                    best, meet = total, neighbor
+
+            if stats:
+                stats.finish(len(forward_queue) + len(backward_queue))
+            if best >= 0:
+                path = self.join_path(forward.parent, backward.parent, meet)
                 yield path  # 返回最终路径
                 return
-            for neighbor in self.get_neighbors(current):
-                if neighbor not in visited:
-                    queue.append(neighbor)
-                    visited.add(neighbor)
-                    parent[neighbor] = current
 
         yield []  # 没有找到路径
 
 
 
-class UniformCostSearch(SearchAlgorithm):
-    """统一代价搜索算法"""
-    def step_search(self):
-        heap = []
-        heapq.heappush(heap, (0, self.start))
-        visited = set()
-        parent = {}
-        cost_so_far = {self.start: 0}
+class BidirectionalAStar(BidirectionalSearch):
+    """双向 A* 搜索算法
 
-        while heap:
-            current_cost, current = heapq.heappop(heap)
-            yield current  # 返回当前节点以进行可视化
+    前向以到终点的曼哈顿距离、后向以到起点的曼哈顿距离为启发式，每次扩展开放列表较小的一侧。
+    两侧 f 值下界中较大者不小于当前最优相遇代价时终止，此时相遇路径即为最优路径。
+    """
+    def heuristic(self, cell):
+        """使用到终点的曼哈顿距离作为前向启发式函数"""
+        return self.grid.manhattan(cell, self.goal_id)
+
+    def backward_heuristic(self, cell):
+        """使用到起点的曼哈顿距离作为后向启发式函数"""
+        return self.grid.manhattan(cell, self.start_id)
+
+    def step_search_cells(self):
+        passable = self.grid.passable
+        offsets = self.grid.offsets
+        stats = self.stats
+        with self.grid.search_state() as forward, self.grid.search_state() as backward:
+            forward_heap = [(self.heuristic(self.start_id), 0, self.start_id)]
+            backward_heap = [(self.backward_heuristic(self.goal_id), 0, self.goal_id)]
+            for state, cell in ((forward, self.start_id), (backward, self.goal_id)):
+                state.mark[cell] = state.seen
+                state.cost[cell] = 0
+            best, meet = -1, -1
+            if self.start_id == self.goal_id:
+                best, meet = 0, self.start_id
 
-            if current == self.goal:
-                path = self.reconstruct_path(parent, current)
+            while True:
+                # 清除堆顶已扩展过的过期条目
+                while forward_heap and forward.mark[forward_heap[0][2]] == forward.closed:
+                    if stats:
+                        stats.popped(len(forward_heap) + len(backward_heap), stale=True)
+                    heapq.heappop(forward_heap)
+                while backward_heap and backward.mark[backward_heap[0][2]] == backward.closed:
+                    if stats:
+                        stats.popped(len(forward_heap) + len(backward_heap), stale=True)
+                    heapq.heappop(backward_heap)
+                if not forward_heap or not backward_heap:
+                    break
+                if best >= 0 and max(forward_heap[0][0], backward_heap[0][0]) >= best:
+                    break
+
+                if len(forward_heap) <= len(backward_heap):
+                    heap, own, other, heuristic = forward_heap, forward, backward, self.heuristic
+                else:
+                    heap, own, other, heuristic = backward_heap, backward, forward, self.backward_heuristic
+                _, current_cost, current = heapq.heappop(heap)
+                if stats:
+                    stats.popped(len(forward_heap) + len(backward_heap) + 1)
+                yield current  # 返回当前节点以进行可视化
+
+                own.mark[current] = own.closed
+                parent, cost, mark, seen = own.parent, own.cost, own.mark, own.seen
+                for offset in offsets:
+                    neighbor = current + offset
+                    if not passable[neighbor]:
+                        continue
+                    new_cost = current_cost + 1  # 假设每步代价为1
+                    if mark[neighbor] < seen or new_cost < cost[neighbor]:
+                        if mark[neighbor] < seen:
+                            mark[neighbor] = seen
+                        cost[neighbor] = new_cost
+                        heapq.heappush(heap, (new_cost + heuristic(neighbor), new_cost, neighbor))
+                        parent[neighbor] = current
+                        if other.mark[neighbor] >= other.seen:
+                            total = new_cost + other.cost[neighbor]
+                            if best < 0 or total < best:
+                                best, meet = total, neighbor
+
+            if stats:
+                stats.finish(len(forward_heap) + len(backward_heap))
+            if best >= 0:
+                path = self.join_path(forward.parent, backward.parent, meet)
                 yield path  # 返回最终路径
                 return
-            if current in visited:
-                continue
-            visited.add(current)
-            for neighbor in self.get_neighbors(current):
-                new_cost = current_cost + 1  # 假设每步代价为1
-                if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
-                    cost_so_far[neighbor] = new_cost
-                    heapq.heappush(heap, (new_cost, neighbor))
-                    parent[neighbor] = current
 
         yield []  # 没有找到路径
 
 
+class IDAStarSearch(SearchAlgorithm):
+    """IDA*（迭代加深 A*）搜索算法
 
-class GreedySearch(SearchAlgorithm):
-    """贪心搜索算法"""
-    def heuristic(self, position):
+    以 f 值为界做深度优先搜索，每轮把界提高到上一轮超界的最小 f 值，代价与 A* 相同。
+    内存只有当前路径和 budget 个槽位的置换表：格子按编号对 budget 取模放入槽位，记录本轮到达它的最小 g 值，
+    再次以不更小的 g 值到达时剪枝；槽位冲突时新格子覆盖旧格子，只会多做重复搜索，不影响结果。
+    budget 为 0 时不使用置换表（纯 IDA*，在开阔地图上会指数级地重复搜索）。
+    逐步搜索时返回每次访问的格子，同一格子在不同轮次中会重复出现。
+    """
+    in_defaults = False  # 在大地图上反复加深非常慢
+    INF = 0x3FFFFFFF
+
+    def __init__(self, map_data, start, goal, stats=None, budget=DEFAULT_NODE_BUDGET):
+        super().__init__(map_data, start, goal, stats)
+        if budget < 0:
+            raise ValueError(f"节点预算不能为负数：{budget}")
+        self.budget = budget
+
+    def heuristic(self, cell):
         """使用曼哈顿距离作为启发式函数"""
-        return abs(position[0] - self.goal[0]) + abs(position[1] - self.goal[1])
+        return self.grid.manhattan(cell, self.goal_id)
 
-    def step_search(self):
-        heap = []
-        heapq.heappush(heap, (self.heuristic(self.start), self.start))
-        visited = set()
-        parent = {}
+    def step_search_cells(self):
+        stats = self.stats
+        goal = self.goal_id
+        heuristic = self.heuristic
+        budget = self.budget
+        INF = self.INF
+        bound = heuristic(self.start_id)
+        slots = max(budget, 1)
+        keys = array('i', [-1]) * slots  # 槽位中的格子编号
+        depths = array('i', [0]) * slots  # 该格子本轮的最小 g 值
+        while True:
+            if budget:
+                keys[:] = array('i', [-1]) * slots
+            path = [self.start_id]
+            on_path = {self.start_id}
+            next_bound = INF
+            if stats:
+                stats.popped(1)
+            yield self.start_id
+            if self.start_id == goal:
+                yield [self.grid.to_pos(goal)]
+                return
+            stack = [self.children(self.start_id, 0)]  # 每层待访问的邻居
+            while stack:
+                child = next(stack[-1], None)
+                if child is None:
+                    stack.pop()
+                    on_path.discard(path.pop())
+                    continue
+                f, cell = child
+                g = len(path)
+                slot = cell % slots
+                if cell in on_path or (keys[slot] == cell and depths[slot] <= g):
+                    continue
+                if f > bound:
+                    if f < next_bound:
+                        next_bound = f
+                    continue
+                if budget:
+                    keys[slot] = cell
+                    depths[slot] = g
+                if stats:
+                    stats.popped(1)
+                yield cell  # 返回当前节点以进行可视化
+                path.append(cell)
+                on_path.add(cell)
+                if cell == goal:
+                    to_pos = self.grid.to_pos
+                    yield [to_pos(step) for step in path]  # 返回最终路径
+                    return
+                stack.append(self.children(cell, g))
+            if next_bound == INF:
+                break  # 没有超界的节点，终点不可达
+            bound = next_bound
+
+        yield []  # 没有找到路径
+
+    def children(self, cell, g):
+        """cell（g 值为 g）的可通行邻居，按 f 值从小到大排列，最有希望的邻居先访问"""
+        passable = self.grid.passable
+        heuristic = self.heuristic
+        return iter(sorted((g + 1 + heuristic(neighbor), neighbor) for neighbor in
+                           (cell + offset for offset in self.grid.offsets) if passable[neighbor]))
+
+
+class SMAStarSearch(SearchAlgorithm):
+    """内存受限的 A*（SMA* 的简化实现）
+
+    每个格子至多保存一个节点 [g, f, 父节点, 子节点数, 遗忘的最小 f]，保存的节点数不超过 budget。
+    内存将满时删除 f 最大的叶子节点，把它的 f 值记在父节点上，
+    父节点以记下的 f 值重新进入开放列表（仍保留其余子节点），再次扩展时重新生成被删除的子节点。
+    f 值沿路径取最大值（pathmax）保证不减，在预算足够容纳最优路径时代价与 A* 相同。
+    开放列表中 f 相同时先扩展最深的节点，删除时先删除最浅的叶子，保证搜索不断向前推进。
+    深度达到预算上限、无法再扩展的非终点节点 f 值记为 CUTOFF，只剩这类节点时说明预算不足，抛出 ValueError；
+    扩展次数超过 SMA_EXPANSION_FACTOR 倍格子数时同样视为预算不足。
+    components 为同一地图上已建好的 Components.ComponentIndex 时，先用它直接判定不连通的查询；
+    搜索本身不建索引（标记整张地图需要与地图大小成正比的内存，违背节点预算的本意），不连通时靠扩展次数上限结束。
+    """
+    in_defaults = False  # 预算不足时抛出 ValueError，大地图上遗忘和重新生成节点也很慢
+    INF = 0x3FFFFFFF
+    CUTOFF = INF - 1
+
+    def __init__(self, map_data, start, goal, stats=None, budget=DEFAULT_NODE_BUDGET, components=None):
+        super().__init__(map_data, start, goal, stats)
+        if budget < len(self.grid.offsets) + 1:
+            raise ValueError(f"节点预算至少为 {len(self.grid.offsets) + 1}：{budget}")
+        self.budget = budget
+        self.components = components
+
+    def heuristic(self, cell):
+        """使用曼哈顿距离作为启发式函数"""
+        return self.grid.manhattan(cell, self.goal_id)
+
+    def step_search_cells(self):
+        passable = self.grid.passable
+        offsets = self.grid.offsets
+        stats = self.stats
+        goal = self.goal_id
+        heuristic = self.heuristic
+        INF = self.INF
+        max_depth = self.budget - len(offsets) - 1  # 扩展该深度的节点需要保存整条路径和全部子节点
+        if self.components is not None and not self.components.connected(self.start, self.goal):
+            yield []  # 起点和终点不连通
+            return
+        expansions_left = SMA_EXPANSION_FACTOR * self.grid.size
+        start_f = heuristic(self.start_id)
+        self.nodes = nodes = {self.start_id: [0, start_f, -1, 0, INF]}
+        self.open_f = open_f = {}  # 在开放列表中的节点 -> 排队时的 f 值
+        self.heap = heap = []  # 按 (f, -g) 排序，f 最小、最深的节点先扩展
+        self.worst = []  # 删除候选，按 (-f, g) 排序，f 最大、最浅的叶子先删除
+        self.schedule(self.start_id, start_f)
 
         while heap:
-            _, current = heapq.heappop(heap)
+            f, _, current = heapq.heappop(heap)
+            stale = open_f.get(current) != f
+            if stats:
+                stats.popped(len(heap) + 1, stale)
+            if stale:
+                continue
+            if f >= self.CUTOFF:
+                raise ValueError(f"节点预算 {self.budget} 不足以找到路径")
+            expansions_left -= 1
+            if expansions_left < 0:
+                raise ValueError(f"节点预算 {self.budget} 不足以找到路径：反复遗忘和重新生成节点而没有进展")
             yield current  # 返回当前节点以进行可视化
 
-            if current == self.goal:
-                path = self.reconstruct_path(parent, current)
-                yield path  # 返回最终路径
+            if current == goal:
+                path = []
+                while current != -1:
+                    path.append(current)
+                    current = nodes[current][2]
+                path.reverse()
+                to_pos = self.grid.to_pos
+                yield [to_pos(cell) for cell in path]  # 返回最终路径
                 return
-            if current in visited:
-                continue
-            visited.add(current)
-            for neighbor in self.get_neighbors(current):
-                if neighbor not in visited:
-                    heapq.heappush(heap, (self.heuristic(neighbor), neighbor))
-                    parent[neighbor] = current
+            node = nodes[current]
+            # 先腾出足够容纳全部子节点的空间，刚生成的子节点不会马上被删除；
+            # 扩展结束前子节点数多记 1，腾空间或改挂子节点时当前节点不会被当作叶子删除
+            node[3] += 1
+            while len(nodes) + len(offsets) > self.budget:
+                self.forget_worst()
+            del open_f[current]  # 腾空间时仍留在开放列表中，其子节点被遗忘时不会再次排队
+
+            node[4] = INF  # 被遗忘的子节点都将重新生成
+            g = node[0] + 1
+            for offset in offsets:
+                neighbor = current + offset
+                if not passable[neighbor]:
+                    continue
+                other = nodes.get(neighbor)
+                neighbor_f = max(f, g + heuristic(neighbor))
+                if g > max_depth and neighbor != goal:
+                    neighbor_f = self.CUTOFF
+                if other is None:
+                    nodes[neighbor] = [g, neighbor_f, current, 0, INF]
+                elif other[0] > g:
+                    # 找到更短的路径：改挂到当前节点下，重新扩展以更新其子节点
+                    old_parent = other[2]
+                    other[0], other[1], other[2] = g, neighbor_f, current
+                    nodes[old_parent][3] -= 1
+                    if not nodes[old_parent][3] and old_parent != current:
+                        self.became_leaf(old_parent)
+                else:
+                    continue
+                node[3] += 1
+                self.schedule(neighbor, neighbor_f)
+            node[3] -= 1
+            if not node[3]:
+                self.became_leaf(current)  # 死路，或所有邻居都已有更短的路径
 
         yield []  # 没有找到路径
 
+    def schedule(self, cell, f):
+        """把节点以 f 值放入开放列表"""
+        self.open_f[cell] = f
+        heapq.heappush(self.heap, (f, -self.nodes[cell][0], cell))
+        heapq.heappush(self.worst, (-f, self.nodes[cell][0], cell))
+        if len(self.heap) > 2 * self.budget or len(self.worst) > 2 * self.budget:
+            self.compact()
 
+    def compact(self):
+        """丢弃两个堆中的过期条目，使堆的大小也不超过节点预算"""
+        nodes = self.nodes
+        self.heap[:] = [(f, -nodes[cell][0], cell) for cell, f in self.open_f.items()]
+        self.worst[:] = [(-f, nodes[cell][0], cell) for cell, f in self.open_f.items()]
+        heapq.heapify(self.heap)
+        heapq.heapify(self.worst)
 
-class AStarSearch(SearchAlgorithm):
-    """A* 搜索算法"""
-    def heuristic(self, position):
+    def forget_worst(self):
+        """删除 f 值最大的叶子节点"""
+        nodes, open_f, worst = self.nodes, self.open_f, self.worst
+        kept = []  # 仍在开放列表中、但还有子节点或是起点的条目，之后放回
+        while worst:
+            entry = heapq.heappop(worst)
+            f, _, cell = entry
+            if open_f.get(cell) != -f:
+                continue  # 过期条目
+            if nodes[cell][3] or cell == self.start_id:
+                kept.append(entry)
+                continue
+            self.remove(cell, -f)
+            for entry in kept:
+                heapq.heappush(worst, entry)
+            return
+        raise ValueError(f"节点预算 {self.budget} 不足以容纳搜索所需的路径")
+
+    def remove(self, cell, f):
+        """删除叶子节点，在父节点上记下它的 f 值；父节点因此成为死路时沿路径逐个向上删除（循环而非递归，死路可能很长）"""
+        nodes = self.nodes
+        while True:
+            node = nodes.pop(cell, None)
+            if node is None:
+                return  # 已被删除
+            self.open_f.pop(cell, None)
+            parent = node[2]
+            parent_node = nodes.get(parent)
+            if parent_node is None:
+                return  # 起点，或父节点已被删除
+            if f < parent_node[4]:
+                parent_node[4] = f
+            parent_node[3] -= 1
+            if parent_node[3] > 0:
+                if f < self.INF and parent not in self.open_f:
+                    # 父节点还有其他子节点：以被遗忘子节点的 f 值重新排队，轮到它时重新生成被遗忘的子节点
+                    self.schedule(parent, parent_node[4])
+                return
+            if self.requeue(parent):
+                return
+            cell, f = parent, self.INF
+
+    def became_leaf(self, cell):
+        """节点失去所有子节点：仍有被遗忘的子节点时以记下的 f 值重新排队，否则是死路，直接删除"""
+        if not self.requeue(cell):
+            self.remove(cell, self.INF)
+
+    def requeue(self, cell):
+        """失去所有子节点的节点需要保留时返回 True：已在开放列表中、是起点，或仍有被遗忘的子节点（以记下的 f 值重新排队）"""
+        if cell in self.open_f:
+            return True
+        node = self.nodes[cell]
+        if node[4] < self.INF:
+            node[1] = node[4]
+            self.schedule(cell, node[4])
+            return True
+        return cell == self.start_id
+
+
+class ARAStarSearch(SearchAlgorithm):
+    """ARA*（随时可用的加权 A*）搜索算法
+
+    先以 f = g + weight·h 的加权 A* 快速找到第一条路径，之后逐轮减小权重，复用已有的 g 值和父节点，
+    只重新扩展上一轮中 g 值变小的不一致节点来改进路径。路径代价变小时产出一次，最后产出的是最好的路径。
+    bound 为当前路径的次优上界（路径代价 ≤ bound × 最优代价），降到 1 时路径最短，搜索结束；
+    deadline 为秒数时，超时后在已找到的路径处停止（第一条路径总会找完）。
+    """
+    anytime = True
+    INF = 0x3FFFFFFF
+
+    def __init__(self, map_data, start, goal, stats=None, weight=ARA_WEIGHT, weight_step=ARA_WEIGHT_STEP,
+                 deadline=None):
+        super().__init__(map_data, start, goal, stats)
+        if weight < 1 or weight_step <= 0:
+            raise ValueError(f"权重不能小于 1、步长必须为正数：{weight}, {weight_step}")
+        self.weight = weight
+        self.weight_step = weight_step
+        self.deadline = deadline
+        self.bound = None
+
+    def heuristic(self, cell):
         """使用曼哈顿距离作为启发式函数"""
-        return abs(position[0] - self.goal[0]) + abs(position[1] - self.goal[1])
+        return self.grid.manhattan(cell, self.goal_id)
 
     def step_search(self):
-        heap = []
-        heapq.heappush(heap, (self.heuristic(self.start), 0, self.start))
-        visited = set()
-        parent = {}
-        cost_so_far = {self.start: 0}
+        """与基类相同，但每找到一条更好的路径就产出一次"""
+        to_pos = self.grid.to_pos
+        for result in self.run_cells():
+            yield result if isinstance(result, list) else to_pos(result)
+
+    def step_search_cells(self):
+        passable = self.grid.passable
+        offsets = self.grid.offsets
+        stats = self.stats
+        goal = self.goal_id
+        heuristic = self.heuristic
+        clock = time.perf_counter
+        stop_at = clock() + self.deadline if self.deadline is not None else None
+        weight = self.weight
+        with self.grid.search_state() as state:
+            # mark == seen：在开放列表中；mark == closed：本轮已扩展；介于两者之间：之前的轮次中已扩展
+            parent, cost, mark = state.parent, state.cost, state.mark
+            seen = state.seen
+            cost[self.start_id] = 0
+            parent[self.start_id] = -1
+            mark[self.start_id] = seen
+            heap = [(weight * heuristic(self.start_id), 0, self.start_id)]
+            incons = set()  # 本轮已扩展、之后 g 值又变小的节点
+            found = False
+            best = self.INF  # 已产出路径的代价
+            path = []  # 已产出的最好路径
+            while True:
+                closed = state.closed = state.closed + 1  # 每轮使用新的扩展标记
+                expansions = 0
+                while heap:
+                    f, g, current = heap[0]
+                    if mark[current] != seen or g != cost[current]:
+                        heapq.heappop(heap)  # 已扩展或已有更小 g 值的过期条目
+                        if stats:
+                            stats.popped(len(heap) + 1, True)
+                        continue
+                    if mark[goal] >= seen and f >= cost[goal]:
+                        break  # 开放列表中没有能改进当前路径的节点
+                    heapq.heappop(heap)
+                    if stats:
+                        stats.popped(len(heap) + 1)
+                    yield current  # 返回当前节点以进行可视化
+                    mark[current] = closed
+                    for offset in offsets:
+                        neighbor = current + offset
+                        if not passable[neighbor]:
+                            continue
+                        new_cost = g + 1
+                        if mark[neighbor] < seen or new_cost < cost[neighbor]:
+                            cost[neighbor] = new_cost
+                            parent[neighbor] = current
+                            if mark[neighbor] == closed:
+                                incons.add(neighbor)
+                            else:
+                                mark[neighbor] = seen
+                                heapq.heappush(heap, (new_cost + weight * heuristic(neighbor), new_cost, neighbor))
+                    expansions += 1
+                    if found and stop_at is not None and expansions % 256 == 0 and clock() >= stop_at:
+                        break  # 超时，保留上一条路径
+                else:
+                    if mark[goal] < seen:
+                        break  # 开放列表已空，终点不可达
+                if found and stop_at is not None and clock() >= stop_at:
+                    yield path  # 最后产出的仍须是路径
+                    return
+
+                # 次优上界：当前代价与开放列表、不一致节点中最小的 g + h 之比
+                pending = [cell for _, g, cell in heap if mark[cell] == seen and g == cost[cell]]
+                pending.extend(incons)
+                lower = min((cost[cell] + heuristic(cell) for cell in pending), default=cost[goal])
+                self.bound = min(weight, cost[goal] / lower) if lower else 1.0
+                found = True
+                improved = cost[goal] < best
+                if improved:
+                    best = cost[goal]
+                    path = self.reconstruct_path(parent, goal)
+                    yield path  # 返回改进后的路径
+                if self.bound <= 1 or (stop_at is not None and clock() >= stop_at):
+                    if not improved:
+                        yield path  # 本轮没有改进，再次产出已有的最好路径，保证最后产出的是路径
+                    return
+
+                # 减小权重，把不一致节点放回开放列表，按新的权重重建优先队列
+                weight = max(1.0, weight - self.weight_step)
+                for cell in incons:
+                    mark[cell] = seen
+                incons.clear()
+                heap = [(cost[cell] + weight * heuristic(cell), cost[cell], cell)
+                        for cell in dict.fromkeys(pending)]
+                heapq.heapify(heap)
+                if stats:
+                    stats.frontier_size = len(heap)  # 重建优先队列时丢弃的过期条目不计入入队
+
+        yield []  # 没有找到路径
 
+
+class LPAStarSearch(SearchAlgorithm):
+    """LPA*（终身规划 A*）增量搜索算法
+
+    规划器保留上一次搜索得到的 g / rhs 值。地图上的格子开关后调用 cells_changed（或 set_cells），
+    再次执行 step_search 时只修复受影响的节点，重规划的代价与改动规模相关，而与地图大小无关。
+    """
+    INF = 0x3FFFFFFF
+
+    def __init__(self, map_data, start, goal, stats=None):
+        super().__init__(map_data, start, goal, stats)
+        size = self.grid.size
+        self.g = array('i', [self.INF]) * size
+        self.rhs = array('i', [self.INF]) * size
+        self.heap = []
+        self.open_keys = {}  # 节点在开放列表中的当前键，用于惰性删除
+        self.rhs[self.start_id] = 0
+        self.push(self.start_id)
+
+    def heuristic(self, cell):
+        """使用曼哈顿距离作为启发式函数"""
+        return self.grid.manhattan(cell, self.goal_id)
+
+    def calculate_key(self, cell):
+        value = min(self.g[cell], self.rhs[cell])
+        return (value + self.heuristic(cell), value)
+
+    def push(self, cell):
+        key = self.calculate_key(cell)
+        self.open_keys[cell] = key
+        heapq.heappush(self.heap, (key[0], key[1], cell))
+
+    def top_key(self):
+        """开放列表中的最小键（开放列表为空时返回 None），跳过已失效的条目"""
+        heap = self.heap
         while heap:
-            _, current_cost, current = heapq.heappop(heap)
+            k1, k2, cell = heap[0]
+            if self.open_keys.get(cell) == (k1, k2):
+                return (k1, k2)
+            if self.stats:
+                self.stats.popped(len(heap), stale=True)
+            heapq.heappop(heap)
+        return None
+
+    def update_vertex(self, cell):
+        """根据邻居的 g 值重新计算 rhs，并调整节点在开放列表中的位置"""
+        if cell != self.start_id:
+            passable = self.grid.passable
+            best = self.INF
+            if passable[cell]:
+                g = self.g
+                for offset in self.grid.offsets:
+                    neighbor = cell + offset
+                    if passable[neighbor] and g[neighbor] + 1 < best:
+                        best = g[neighbor] + 1
+            self.rhs[cell] = best
+        self.open_keys.pop(cell, None)
+        if self.g[cell] != self.rhs[cell]:
+            self.push(cell)
+
+    def cells_changed(self, positions):
+        """通知规划器：这些坐标的可通行状态已在网格中被修改"""
+        offsets = self.grid.offsets
+        affected = set()
+        for position in positions:
+            cell = self.grid.to_id(position)
+            affected.add(cell)
+            affected.update(cell + offset for offset in offsets)
+        for cell in affected:
+            if 0 <= cell < self.grid.size:
+                self.update_vertex(cell)
+
+    def set_cells(self, changes):
+        """修改网格中的格子并通知规划器，changes 为 (坐标, 是否可通行) 的序列"""
+        changes = list(changes)
+        for position, passable in changes:
+            self.grid.set_passable(position, passable)
+        self.cells_changed(position for position, _ in changes)
+
+    def extract_path(self):
+        """沿 g 值递减的方向从终点回溯到起点"""
+        g = self.g
+        if g[self.goal_id] >= self.INF:
+            return []
+        passable = self.grid.passable
+        offsets = self.grid.offsets
+        current = self.goal_id
+        path = [current]
+        while current != self.start_id:
+            best, best_g = -1, g[current]
+            for offset in offsets:
+                neighbor = current + offset
+                if passable[neighbor] and g[neighbor] < best_g:
+                    best, best_g = neighbor, g[neighbor]
+            if best < 0:
+                return []
+            current = best
+            path.append(current)
+        path.reverse()
+        to_pos = self.grid.to_pos
+        return [to_pos(cell) for cell in path]
+
+    def step_search_cells(self):
+        passable = self.grid.passable
+        offsets = self.grid.offsets
+        stats = self.stats
+        goal = self.goal_id
+        g, rhs = self.g, self.rhs
+        if stats:
+            stats.frontier_size = len(self.heap)  # 上一次规划遗留在开放列表中的条目不计入入队
+
+        while True:
+            top = self.top_key()
+            if top is None or (top >= self.calculate_key(goal) and rhs[goal] == g[goal]):
+                break
+            _, _, current = heapq.heappop(self.heap)
+            if stats:
+                stats.popped(len(self.heap) + 1)
+            del self.open_keys[current]
             yield current  # 返回当前节点以进行可视化
 
-            if current == self.goal:
-                path = self.reconstruct_path(parent, current)
-                yield path  # 返回最终路径
-                return
-            if current in visited:
-                continue
-            visited.add(current)
-            for neighbor in self.get_neighbors(current):
-                new_cost = current_cost + 1  # 假设每步代价为1
-                if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
-                    cost_so_far[neighbor] = new_cost
-                    priority = new_cost + self.heuristic(neighbor)
-                    heapq.heappush(heap, (priority, new_cost, neighbor))
-                    parent[neighbor] = current
+            if g[current] > rhs[current]:
+                g[current] = rhs[current]  # 变为局部一致
+            else:
+                g[current] = self.INF  # 局部欠一致，重新计算自身
+                self.update_vertex(current)
+            for offset in offsets:
+                neighbor = current + offset
+                if passable[neighbor]:
+                    self.update_vertex(neighbor)
 
-        yield []  # 没有找到路径
+        if stats:
+            stats.finish(len(self.heap))
+        yield self.extract_path()  # 返回最终路径（找不到时为空列表）
+
+
+# 按名称注册的搜索算法，界面按钮与无界面工具共用
+ALGORITHMS = {
+    "DFS": DFS,
+    "BFS": BFS,
+    "Uniform Cost Search": UniformCostSearch,
+    "Greedy Search": GreedySearch,
+    "A* Search": AStarSearch,
+    "A* (ALT)": ALTSearch,
+    "Jump Point Search": JumpPointSearch,
+    "HPA*": HPAStarSearch,
+    "Bidirectional BFS": BidirectionalBFS,
+    "Bidirectional A*": BidirectionalAStar,
+    "IDA*": IDAStarSearch,
+    "SMA*": SMAStarSearch,
+    "ARA*": ARAStarSearch,
+}
+# 未指定算法时默认运行的算法
+DEFAULT_ALGORITHMS = [name for name, algorithm_class in ALGORITHMS.items() if algorithm_class.in_defaults]
@@ -0,0 +1,115 @@
+# Trace.py
+
+from array import array
+import struct
+import sys
+
+import numpy as np
+
+
+class SearchTrace:
+    """紧凑的搜索过程记录
+
+    按顺序保存搜索每一步探索的格子（编号 i * width + j，int32 数组）以及最终路径，
+    可以保存到磁盘再载入，回放时不需要重新运行搜索算法。
+    文件格式：头部（魔数、版本、宽、高、步数、路径长度、算法名长度），算法名（UTF-8），
+    步骤数组和路径数组（均为小端 int32，路径长度为 -1 表示搜索未完成）。
+    """
+    MAGIC = b"STRC"
+    VERSION = 1
+    HEADER = struct.Struct("<4sIIIIiI")
+
+    def __init__(self, width, height, algorithm=""):
+        self.width = width
+        self.height = height
+        self.algorithm = algorithm
+        self.cells = array('i')
+        self.path = None  # 搜索完成后为 (i, j) 列表，找不到路径时为空列表
+        self._first_index = None
+
+    def __len__(self):
+        return len(self.cells)
+
+    def record(self, steps):
+        """包装 step_search 生成器：原样产出每一步，同时记录到本对象中"""
+        width = self.width
+        cells = self.cells
+        for step in steps:
+            if isinstance(step, list):
+                self.path = step
+            else:
+                cells.append(step[0] * width + step[1])
+                self._first_index = None
+            yield step
+
+    def position(self, index):
+        """第 index 步探索的格子坐标"""
+        return divmod(self.cells[index], self.width)
+
+    def first_steps(self):
+        """每一步是否为该格子第一次被探索（布尔数组），回退时只有这些步需要撤销"""
+        unique, first_index = self.first_index()
+        first = np.zeros(len(self.cells), dtype=bool)
+        first[first_index] = True
+        return first
+
+    def first_index(self):
+        """排好序的已探索格子编号，以及每个格子第一次被探索的步序号"""
+        if self._first_index is None:
+            cells = np.frombuffer(self.cells, dtype=np.int32)
+            self._first_index = np.unique(cells, return_index=True)
+        return self._first_index
+
+    def first_step_of(self, position):
+        """格子第一次被探索的步序号，从未探索过时返回 None"""
+        unique, first_index = self.first_index()
+        cell = position[0] * self.width + position[1]
+        k = int(np.searchsorted(unique, cell))
+        if k < len(unique) and unique[k] == cell:
+            return int(first_index[k])
+        return None
+
+    def save(self, filename):
+        """保存到二进制文件"""
+        name = self.algorithm.encode("utf-8")
+        path = array('i', [] if self.path is None else [i * self.width + j for i, j in self.path])
+        cells = self.cells
+        if sys.byteorder == "big":
+            cells = array('i', cells)
+            cells.byteswap()
+            path.byteswap()
+        with open(filename, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.width, self.height, len(self.cells),
+                                     -1 if self.path is None else len(path), len(name)))
+            f.write(name)
+            f.write(cells.tobytes())
+            f.write(path.tobytes())
+
+    @classmethod
+    def load(cls, filename):
+        """从二进制文件载入"""
+        with open(filename, "rb") as f:
+            data = f.read()
+        if len(data) < cls.HEADER.size:
+            raise ValueError("搜索记录文件不完整")
+        magic, version, width, height, steps, path_length, name_length = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError("不是可识别的搜索记录文件")
+        offset = cls.HEADER.size
+        expected = offset + name_length + 4 * (steps + max(path_length, 0))
+        if len(data) != expected:
+            raise ValueError("搜索记录文件不完整")
+
+        trace = cls(width, height, data[offset:offset + name_length].decode("utf-8"))
+        offset += name_length
+        trace.cells.frombytes(data[offset:offset + 4 * steps])
+        offset += 4 * steps
+        if path_length >= 0:
+            path = array('i')
+            path.frombytes(data[offset:offset + 4 * path_length])
+            if sys.byteorder == "big":
+                path.byteswap()
+            trace.path = [divmod(cell, width) for cell in path]
+        if sys.byteorder == "big":
+            trace.cells.byteswap()
+        return trace
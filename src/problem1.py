@@ -1,6 +1,6 @@
 import tkinter as tk
-from tkinter import Canvas, simpledialog, messagebox
-from My_Map import My_Map
+from tkinter import Canvas, simpledialog, messagebox, filedialog
+from My_Map import My_Map, MAX_MAP_SIZE, MAX_VIEW_WIDTH, MAX_VIEW_HEIGHT
 
 def open_selection_window():
     """选择地图模式的窗口"""
@@ -29,26 +29,30 @@ def set_mode(mode):
 
 def enter_random_map_mode():
     """进入随机地图模式，用户输入参数生成地图"""
-    global map_width, map_height, cell_size, start_x, start_y, goal_x, goal_y
+    global map_width, map_height, cell_size, start_x, start_y, goal_x, goal_y, map_generator
 
     # 用户输入地图参数
-    map_width = simpledialog.askinteger("输入", "请输入地图宽度：", minvalue=5, maxvalue=50)
-    map_height = simpledialog.askinteger("输入", "请输入地图高度：", minvalue=5, maxvalue=50)
-    cell_size = simpledialog.askinteger("输入", "请输入单元格大小（像素）：", minvalue=10, maxvalue=100)
+    map_width = simpledialog.askinteger("输入", "请输入地图宽度：", minvalue=5, maxvalue=MAX_MAP_SIZE)
+    map_height = simpledialog.askinteger("输入", "请输入地图高度：", minvalue=5, maxvalue=MAX_MAP_SIZE)
+    cell_size = simpledialog.askinteger("输入", "请输入单元格大小（像素）：", minvalue=1, maxvalue=100)
     start_x = simpledialog.askinteger("输入", "请输入起点的X坐标：", minvalue=1, maxvalue=map_width - 2)
     start_y = simpledialog.askinteger("输入", "请输入起点的Y坐标：", minvalue=1, maxvalue=map_height - 2)
     goal_x = simpledialog.askinteger("输入", "请输入终点的X坐标：", minvalue=1, maxvalue=map_width - 2)
     goal_y = simpledialog.askinteger("输入", "请输入终点的Y坐标：", minvalue=1, maxvalue=map_height - 2)
+    map_generator = simpledialog.askstring(
+        "输入", "请输入地图生成算法（random / backtracker / kruskal / wilson）：", initialvalue="random"
+    ) or "random"
 
-    # 调整画布大小
-    canvas.config(width=map_width * cell_size, height=map_height * cell_size)
+    # 调整画布大小，地图超出最大尺寸时通过视口滚动和缩放查看
+    canvas.config(width=min(map_width * cell_size, MAX_VIEW_WIDTH), height=min(map_height * cell_size, MAX_VIEW_HEIGHT))
 
     # 初始化 My_Map 对象
     global my_map
     my_map = My_Map(width=map_width, height=map_height, cell_size=cell_size, canvas=canvas)
 
-    # 创建路径代价标签
+    # 创建路径代价标签和回放进度滑块
     my_map.create_cost_label(root)
+    my_map.create_replay_scale(root)
 
     # 生成随机地图
     generate_random_map()
@@ -63,7 +67,8 @@ def generate_random_map():
         height=map_height,
         cell_size=cell_size,
         start_position=(start_x, start_y),
-        goal_position=(goal_x, goal_y)
+        goal_position=(goal_x, goal_y),
+        generator=map_generator
     )
     my_map.render_map()  # 实时更新地图
     messagebox.showinfo("地图已刷新", "随机地图已成功刷新！")  # 刷新后显示提示
@@ -91,8 +96,9 @@ def enter_predefined_map_mode():
     global my_map
     my_map = My_Map(width=map_width, height=map_height, cell_size=cell_size, canvas=canvas)
 
-    # 创建路径代价标签
+    # 创建路径代价标签和回放进度滑块
     my_map.create_cost_label(root)
+    my_map.create_replay_scale(root)
 
     # 设置预定义地图
     my_map.set_map(MAP)
@@ -100,9 +106,57 @@ def enter_predefined_map_mode():
     # 显示地图和控制按钮
     display_map()
 
+def ask_playback():
+    """输入搜索动画的播放方式"""
+    playback = simpledialog.askstring(
+        "输入", "请输入每帧推进的搜索步数，或 auto（按时间预算尽量多推进）/ skip（直接显示结果）：",
+        initialvalue=str(my_map.playback)
+    )
+    if not playback:
+        return
+    playback = playback.strip()
+    try:
+        my_map.set_playback(int(playback) if playback.isdigit() else playback)
+    except ValueError as error:
+        messagebox.showerror("错误", str(error))
+
+def save_trace():
+    """保存最近一次搜索的过程记录"""
+    filename = filedialog.asksaveasfilename(defaultextension=".trace", filetypes=[("搜索记录", "*.trace")])
+    if not filename:
+        return
+    try:
+        my_map.save_trace(filename)
+    except (OSError, ValueError) as error:
+        messagebox.showerror("错误", str(error))
+
+def load_trace():
+    """载入搜索记录并回放"""
+    filename = filedialog.askopenfilename(filetypes=[("搜索记录", "*.trace")])
+    if not filename:
+        return
+    try:
+        my_map.load_trace(filename)
+    except (OSError, ValueError) as error:
+        messagebox.showerror("错误", str(error))
+
+def save_map():
+    """把当前地图保存为 .map 文件（或 .bmap 二进制文件）"""
+    filename = filedialog.asksaveasfilename(
+        defaultextension=".map", filetypes=[("地图文件", "*.map"), ("二进制地图", "*.bmap")]
+    )
+    if not filename:
+        return
+    try:
+        my_map.save_map_file(filename)
+    except OSError as error:
+        messagebox.showerror("错误", str(error))
+
 def display_map():
     """显示地图和相关搜索按钮"""
     my_map.render_map()
+    my_map.bind_mouse()  # 点击格子可开关墙壁
+    my_map.bind_viewport(root)  # 大地图：滚轮缩放，方向键或右键拖动滚动
     canvas.pack()  # 现在显示画布
     button_frame.pack(pady=10)  # 现在显示按钮框架
 
@@ -171,4 +225,147 @@ if __name__ == "__main__":
     )
     astar_button.grid(row=0, column=6, padx=5)
 
+    jps_button = tk.Button(
+        button_frame,
+        text="跳点搜索",
+        command=lambda: my_map.run_all_searches("Jump Point Search")
+    )
+    jps_button.grid(row=0, column=7, padx=5)
+
+    bidirectional_bfs_button = tk.Button(
+        button_frame,
+        text="双向 BFS",
+        command=lambda: my_map.run_all_searches("Bidirectional BFS")
+    )
+    bidirectional_bfs_button.grid(row=0, column=8, padx=5)
+
+    bidirectional_astar_button = tk.Button(
+        button_frame,
+        text="双向 A*",
+        command=lambda: my_map.run_all_searches("Bidirectional A*")
+    )
+    bidirectional_astar_button.grid(row=0, column=9, padx=5)
+
+    incremental_button = tk.Button(
+        button_frame,
+        text="增量重规划",
+        command=lambda: my_map.run_incremental_search()
+    )
+    incremental_button.grid(row=0, column=10, padx=5)
+
+    alt_button = tk.Button(
+        button_frame,
+        text="A* 地标启发",
+        command=lambda: my_map.run_all_searches("A* (ALT)")
+    )
+    alt_button.grid(row=0, column=11, padx=5)
+
+    hpa_button = tk.Button(
+        button_frame,
+        text="分层 A*",
+        command=lambda: my_map.run_all_searches("HPA*")
+    )
+    hpa_button.grid(row=0, column=12, padx=5)
+
+    # 搜索动画的播放控制
+    playback_button = tk.Button(
+        button_frame,
+        text="播放速度",
+        command=ask_playback
+    )
+    playback_button.grid(row=1, column=0, padx=5, pady=5)
+
+    skip_button = tk.Button(
+        button_frame,
+        text="跳到结果",
+        command=lambda: my_map.skip_to_result()
+    )
+    skip_button.grid(row=1, column=1, padx=5, pady=5)
+
+    # 搜索记录的回放控制
+    replay_button = tk.Button(
+        button_frame,
+        text="回放",
+        command=lambda: my_map.replay_trace()
+    )
+    replay_button.grid(row=1, column=2, padx=5, pady=5)
+
+    pause_button = tk.Button(
+        button_frame,
+        text="暂停/继续",
+        command=lambda: my_map.pause_replay()
+    )
+    pause_button.grid(row=1, column=3, padx=5, pady=5)
+
+    step_back_button = tk.Button(
+        button_frame,
+        text="后退一步",
+        command=lambda: my_map.step_replay(-1)
+    )
+    step_back_button.grid(row=1, column=4, padx=5, pady=5)
+
+    step_forward_button = tk.Button(
+        button_frame,
+        text="前进一步",
+        command=lambda: my_map.step_replay(1)
+    )
+    step_forward_button.grid(row=1, column=5, padx=5, pady=5)
+
+    save_trace_button = tk.Button(
+        button_frame,
+        text="保存记录",
+        command=save_trace
+    )
+    save_trace_button.grid(row=1, column=6, padx=5, pady=5)
+
+    load_trace_button = tk.Button(
+        button_frame,
+        text="载入记录",
+        command=load_trace
+    )
+    load_trace_button.grid(row=1, column=7, padx=5, pady=5)
+
+    save_map_button = tk.Button(
+        button_frame,
+        text="保存地图",
+        command=save_map
+    )
+    save_map_button.grid(row=1, column=8, padx=5, pady=5)
+
+    # 多进程同时运行所有算法
+    race_button = tk.Button(
+        button_frame,
+        text="并行竞速",
+        command=lambda: my_map.run_portfolio("race")
+    )
+    race_button.grid(row=1, column=9, padx=5, pady=5)
+
+    compare_button = tk.Button(
+        button_frame,
+        text="并行对比",
+        command=lambda: my_map.run_portfolio("compare")
+    )
+    compare_button.grid(row=1, column=10, padx=5, pady=5)
+
+    ida_button = tk.Button(
+        button_frame,
+        text="IDA*",
+        command=lambda: my_map.run_all_searches("IDA*")
+    )
+    ida_button.grid(row=1, column=11, padx=5, pady=5)
+
+    sma_button = tk.Button(
+        button_frame,
+        text="内存受限 A*",
+        command=lambda: my_map.run_all_searches("SMA*")
+    )
+    sma_button.grid(row=1, column=12, padx=5, pady=5)
+
+    ara_button = tk.Button(
+        button_frame,
+        text="随时可用 A*",
+        command=lambda: my_map.run_all_searches("ARA*")
+    )
+    ara_button.grid(row=1, column=13, padx=5, pady=5)
+
     root.mainloop()